@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Training Throughput Auto-Tuner for AI Takeoff MVP
+
+Runs short timed trials to pick the CPU training settings (batch size,
+dataloader workers, torch threads, image caching) that give the highest
+images/sec within a memory budget. Used by scripts/train.py --auto-tune.
+
+ultralytics forces dataloader workers to 0 for CPU training, so on CPU the
+worker count is not searched; loading then runs in the training process and
+its cost adds to each step rather than overlapping with it.
+
+Usage:
+    python scripts/autotune.py --data data_labeled/dataset.yaml
+    python scripts/autotune.py --memory-budget-gb 12 --output autotune.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+import yaml
+
+
+BATCH_CANDIDATES = (4, 8, 16, 32)
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+
+
+def _peak_rss_bytes(who=resource.RUSAGE_SELF) -> int:
+    """Peak resident set size (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def total_memory_bytes() -> int:
+    """Physical memory of this machine."""
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+
+def _thread_candidates(cpu_count: int) -> list:
+    candidates = {cpu_count, max(1, cpu_count // 2), max(1, (3 * cpu_count) // 4)}
+    return sorted(candidates)
+
+
+def _compute_trial(weights, imgsz, batch, threads, steps, queue):
+    """Child process: time forward+backward steps on random input."""
+    try:
+        from ultralytics import YOLO
+
+        torch.set_num_threads(threads)
+        model = YOLO(weights).model
+        model.train()
+        for p in model.parameters():
+            p.requires_grad = True
+        optimizer = torch.optim.SGD(model.parameters(), lr=1e-4)
+        x = torch.rand(batch, 3, imgsz, imgsz)
+
+        def step():
+            optimizer.zero_grad()
+            out = model(x)
+            out = out if isinstance(out, (list, tuple)) else [out]
+            loss = sum(o.float().mean() for o in out if torch.is_tensor(o))
+            loss.backward()
+            optimizer.step()
+
+        step()  # warm-up: allocator and kernel selection
+        start = time.perf_counter()
+        for _ in range(steps):
+            step()
+        elapsed = time.perf_counter() - start
+
+        queue.put({
+            'images_per_sec': batch * steps / elapsed,
+            'peak_rss_bytes': _peak_rss_bytes(),
+        })
+    except Exception as e:  # report OOM and friends to the parent
+        queue.put({'error': str(e)})
+
+
+def time_compute(weights, imgsz, batch, threads, steps=3, timeout=600) -> dict:
+    """
+    Run one compute trial in a fresh process so thread settings and peak
+    memory are measured in isolation.
+
+    Returns:
+        {'images_per_sec', 'peak_rss_bytes'} or {'error'}
+    """
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(
+        target=_compute_trial,
+        args=(weights, imgsz, batch, threads, steps, queue)
+    )
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+        return {'error': 'timed out'}
+    if queue.empty():
+        return {'error': f'trial exited with code {proc.exitcode}'}
+    return queue.get()
+
+
+class _ImageDataset(torch.utils.data.Dataset):
+    """Decode + resize, the per-image work the training dataloader does."""
+
+    def __init__(self, files, imgsz):
+        self.files = files
+        self.imgsz = imgsz
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getitem__(self, i):
+        im = cv2.imread(str(self.files[i]))
+        h, w = im.shape[:2]
+        r = self.imgsz / max(h, w)
+        im = cv2.resize(im, (max(1, int(w * r)), max(1, int(h * r))),
+                        interpolation=cv2.INTER_AREA)
+        return torch.from_numpy(np.ascontiguousarray(im[..., ::-1]))
+
+
+def _collate_list(items):
+    return items
+
+
+def time_loader(files, imgsz, workers, batch, max_batches=4) -> float:
+    """
+    Measure dataloader images/sec for a given worker count.
+
+    Returns:
+        Images per second
+    """
+    loader = torch.utils.data.DataLoader(
+        _ImageDataset(files, imgsz),
+        batch_size=batch,
+        num_workers=workers,
+        collate_fn=_collate_list,
+        persistent_workers=False
+    )
+    count = 0
+    start = time.perf_counter()
+    for i, items in enumerate(loader):
+        count += len(items)
+        if i + 1 >= max_batches:
+            break
+    return count / max(time.perf_counter() - start, 1e-9)
+
+
+def disk_cache_speedup(files, sample=4) -> float:
+    """
+    Ratio of image decode time to .npy load time on a few sample images
+    (ultralytics' disk cache stores decoded arrays as .npy).
+    """
+    decode = load = 0.0
+    with tempfile.TemporaryDirectory() as tmp:
+        for f in files[:sample]:
+            start = time.perf_counter()
+            im = cv2.imread(str(f))
+            decode += time.perf_counter() - start
+            npy = Path(tmp) / f'{Path(f).stem}.npy'
+            np.save(npy, im)
+            start = time.perf_counter()
+            np.load(npy)
+            load += time.perf_counter() - start
+    return decode / max(load, 1e-9)
+
+
+def find_training_images(data_yaml: str) -> list:
+    """List training images referenced by a dataset YAML."""
+    data_path = Path(data_yaml)
+    with open(data_path, 'r') as f:
+        config = yaml.safe_load(f)
+    root = data_path.parent
+    if config.get('path'):
+        root = (data_path.parent / config['path']).resolve()
+    images_dir = root / config.get('train', 'images')
+    if not images_dir.exists():
+        images_dir = data_path.parent / config.get('train', 'images')
+    return sorted(p for p in images_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def autotune_training(
+    data_yaml: str = 'data_labeled/dataset.yaml',
+    weights: str = 'yolov8n.pt',
+    imgsz: int = 640,
+    memory_budget_gb: float = None,
+    batch_candidates: tuple = BATCH_CANDIDATES,
+    steps: int = 3,
+    device: str = 'cpu'
+) -> dict:
+    """
+    Pick the fastest CPU training settings that fit the memory budget.
+
+    Args:
+        data_yaml: Path to dataset YAML configuration
+        weights: Starting weights (defines the model architecture)
+        imgsz: Training image size
+        memory_budget_gb: Memory budget (default: 75% of physical RAM)
+        batch_candidates: Batch sizes to try
+        steps: Timed training steps per trial
+        device: Training device; on 'cpu'/'mps' workers are fixed at 0
+            because the ultralytics trainer overrides them
+
+    Returns:
+        Dict with chosen 'batch', 'workers', 'threads', 'cache', the
+        expected 'images_per_sec' and every trial measurement under 'trials'
+    """
+    cpu_count = os.cpu_count() or 1
+    budget = int((memory_budget_gb * 1024**3) if memory_budget_gb
+                 else 0.75 * total_memory_bytes())
+    files = find_training_images(data_yaml)
+    if not files:
+        raise ValueError(f"No training images found for {data_yaml}")
+
+    print(f"\n🔧 Auto-tuning training throughput")
+    print(f"   CPUs: {cpu_count}")
+    print(f"   Memory budget: {budget / 1024**3:.1f} GB")
+    print(f"   Training images: {len(files)}")
+
+    # 1. Compute trials: batch x threads, each in a fresh process
+    trials = []
+    for threads in _thread_candidates(cpu_count):
+        for batch in batch_candidates:
+            trial = time_compute(weights, imgsz, batch, threads, steps)
+            trial.update(batch=batch, threads=threads)
+            trials.append(trial)
+            if 'error' in trial:
+                print(f"   ⚠️  batch={batch} threads={threads}: {trial['error']}")
+                break  # larger batches will not fare better
+            print(f"   • batch={batch:>3} threads={threads:>2}: "
+                  f"{trial['images_per_sec']:.1f} img/s, "
+                  f"peak {trial['peak_rss_bytes'] / 1024**3:.2f} GB")
+            if trial['peak_rss_bytes'] > budget:
+                break
+
+    # 2. Caching: RAM cache holds images resized to imgsz
+    ram_cache_bytes = len(files) * imgsz * imgsz * 3
+    disk_speedup = disk_cache_speedup(files)
+
+    # 3. Loader trials: images/sec per worker count
+    if str(device) in ('cpu', 'mps'):
+        worker_candidates = [0]  # the trainer sets workers=0 on these devices
+    else:
+        worker_candidates = sorted({0, 1, 2, 4, 8} & set(range(cpu_count + 1)))
+    loader_ips = {}
+    for workers in worker_candidates:
+        loader_ips[workers] = time_loader(files, imgsz, workers, batch=min(8, len(files)))
+    print(f"   • dataloader img/s by workers: "
+          + ", ".join(f"{w}={ips:.1f}" for w, ips in loader_ips.items()))
+
+    # 4. Combine: throughput is bounded by the slower of compute and loading
+    best = None
+    for trial in trials:
+        if 'error' in trial:
+            continue
+        for cache in (False, 'disk', 'ram'):
+            for workers, ips in loader_ips.items():
+                if trial['threads'] + workers > cpu_count and workers > 0:
+                    continue
+                memory = trial['peak_rss_bytes'] + workers * 256 * 1024**2
+                if cache == 'ram':
+                    memory += ram_cache_bytes
+                    feed = float('inf')
+                elif cache == 'disk':
+                    feed = ips * disk_speedup
+                else:
+                    feed = ips
+                if memory > budget:
+                    continue
+                if workers == 0:
+                    # In-process loading: load and compute time add up
+                    throughput = 1 / (1 / trial['images_per_sec'] + 1 / feed)
+                else:
+                    # Worker processes overlap loading with compute
+                    throughput = min(trial['images_per_sec'], feed)
+                candidate = {
+                    'batch': trial['batch'],
+                    'threads': trial['threads'],
+                    'workers': workers,
+                    'cache': cache,
+                    'images_per_sec': round(throughput, 2),
+                    'estimated_memory_gb': round(memory / 1024**3, 2),
+                }
+                # Prefer fewer workers / no cache on ties
+                if best is None or throughput > best['images_per_sec'] * 1.02:
+                    best = candidate
+
+    if best is None:
+        raise RuntimeError("No training configuration fits the memory budget")
+
+    best.update(
+        memory_budget_gb=round(budget / 1024**3, 2),
+        cpu_count=cpu_count,
+        device=str(device),
+        imgsz=imgsz,
+        weights=str(weights),
+        trials=trials,
+        loader_images_per_sec=loader_ips,
+        disk_cache_speedup=round(disk_speedup, 2),
+    )
+
+    print(f"\n✅ Chosen settings: batch={best['batch']} workers={best['workers']} "
+          f"threads={best['threads']} cache={best['cache']} "
+          f"(~{best['images_per_sec']:.1f} img/s)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Auto-tune CPU training throughput'
+    )
+
+    parser.add_argument(
+        '--data',
+        type=str,
+        default='data_labeled/dataset.yaml',
+        help='Path to dataset YAML file'
+    )
+
+    parser.add_argument(
+        '--weights',
+        type=str,
+        default='yolov8n.pt',
+        help='Starting weights (default: yolov8n.pt)'
+    )
+
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=640,
+        help='Image size for training'
+    )
+
+    parser.add_argument(
+        '--memory-budget-gb',
+        type=float,
+        help='Memory budget in GB (default: 75%% of RAM)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        help='Path to save chosen settings as JSON'
+    )
+
+    args = parser.parse_args()
+
+    settings = autotune_training(
+        data_yaml=args.data,
+        weights=args.weights,
+        imgsz=args.imgsz,
+        memory_budget_gb=args.memory_budget_gb
+    )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(settings, f, indent=2)
+        print(f"💾 Settings saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Model Compression for AI Takeoff MVP
+
+Prunes the trained model to meet a CPU latency target per tile, fine-tunes
+the pruned model to recover accuracy, and reports the accuracy given up.
+
+Pruning is structured: whole channels with the smallest L1 filter norm are
+sliced out of the trained Conv/BN layers with plain torch, keeping the
+teacher's remaining weights. Only channels internal to a block are pruned -
+the hidden channels of every C2f bottleneck, of SPPF and of the detection
+head branches - so the block outputs, residual adds and concatenations keep
+their shapes and no graph surgery is needed.
+
+The pruned model is fine-tuned on the labeled images outside the held-out
+split, plus teacher pseudo-labels on the unlabeled sheets in data_raw/.
+Teacher and pruned model are both scored on the held-out split.
+
+The output is a regular YOLOv8 checkpoint:
+    python scripts/inference.py --model models/compressed.pt --directory data_raw/
+
+Usage:
+    python scripts/compress.py --target-ms 40
+    python scripts/compress.py --teacher models/best.pt --target-ms 25 --epochs 40
+"""
+
+import argparse
+import copy
+import shutil
+from pathlib import Path
+
+import torch
+import yaml
+from torch import nn
+from ultralytics import YOLO
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.nn.modules import SPPF, Bottleneck, Conv, Detect
+
+from incremental import (DEFAULT_HOLDOUT_FRACTION, IMAGE_SUFFIXES, build_holdout_dataset,
+                         link_file, load_manifest, manifest_matches_split)
+from latency import measure_latency
+
+
+# Fraction of prunable channels removed, tried from lightest to heaviest
+PRUNE_RATIOS = (0.25, 0.4, 0.5, 0.6, 0.7, 0.8)
+# Never prune a layer below this many channels
+MIN_CHANNELS = 8
+
+
+def _l1_keep(conv: Conv, ratio: float) -> torch.Tensor:
+    """Sorted indices of the output channels with the largest L1 filter norm."""
+    weight = conv.conv.weight.detach()
+    count = weight.shape[0]
+    keep = max(MIN_CHANNELS, int(round(count * (1 - ratio))))
+    if keep >= count:
+        return torch.arange(count)
+    return weight.abs().sum(dim=(1, 2, 3)).topk(keep).indices.sort().values
+
+
+def _prune_out(conv: Conv, keep: torch.Tensor):
+    """Keep only the given output channels of a Conv (conv + BatchNorm)."""
+    conv.conv.weight = nn.Parameter(conv.conv.weight.data[keep].clone())
+    conv.conv.out_channels = len(keep)
+    bn = conv.bn
+    bn.weight = nn.Parameter(bn.weight.data[keep].clone())
+    bn.bias = nn.Parameter(bn.bias.data[keep].clone())
+    bn.running_mean = bn.running_mean[keep].clone()
+    bn.running_var = bn.running_var[keep].clone()
+    bn.num_features = len(keep)
+
+
+def _prune_in(layer, keep: torch.Tensor):
+    """Keep only the given input channels of a Conv or plain Conv2d."""
+    conv2d = layer.conv if isinstance(layer, Conv) else layer
+    conv2d.weight = nn.Parameter(conv2d.weight.data[:, keep].clone())
+    conv2d.in_channels = len(keep)
+
+
+def _prunable(conv) -> bool:
+    return (isinstance(conv, Conv) and isinstance(conv.bn, nn.BatchNorm2d)
+            and conv.conv.groups == 1)
+
+
+def prune_model(model: nn.Module, ratio: float) -> int:
+    """
+    L1-norm structured pruning of block-internal channels, in place.
+
+    Args:
+        model: Unfused ultralytics DetectionModel
+        ratio: Fraction of each prunable layer's channels to remove
+
+    Returns:
+        Number of channels removed
+    """
+    removed = 0
+    for module in model.modules():
+        pairs = []
+        if isinstance(module, Bottleneck):
+            pairs.append((module.cv1, module.cv2, 1))
+        elif isinstance(module, SPPF):
+            # cv2 sees cv1's output and three max-pools of it, concatenated
+            pairs.append((module.cv1, module.cv2, 4))
+        elif isinstance(module, Detect):
+            for branch in list(module.cv2) + list(module.cv3):
+                layers = list(branch) if isinstance(branch, nn.Sequential) else []
+                if len(layers) == 3 and isinstance(layers[2], nn.Conv2d):
+                    pairs.append((layers[0], layers[1], 1))
+                    pairs.append((layers[1], layers[2], 1))
+
+        for producer, consumer, repeats in pairs:
+            if not _prunable(producer) or not (_prunable(consumer)
+                                               or isinstance(consumer, nn.Conv2d)):
+                continue
+            count = producer.conv.out_channels
+            keep = _l1_keep(producer, ratio)
+            if len(keep) == count:
+                continue
+            _prune_out(producer, keep)
+            _prune_in(consumer, torch.cat([keep + i * count for i in range(repeats)]))
+            removed += count - len(keep)
+    return removed
+
+
+def save_checkpoint(model: nn.Module, path: Path) -> Path:
+    """Save a model as a checkpoint YOLO() can load (keeps pruned shapes)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    torch.save({'model': copy.deepcopy(model).float(), 'train_args': {}}, path)
+    return path
+
+
+class PrunedModelTrainer(DetectionTrainer):
+    """
+    Fine-tunes the loaded (pruned) model as-is. The stock trainer rebuilds
+    the model from its YAML and copies matching weights, which would undo
+    the pruning.
+    """
+
+    def get_model(self, cfg=None, weights=None, verbose=True):
+        return weights
+
+
+def pseudo_label(teacher: YOLO, source_dir: Path, output_dir: Path,
+                 skip: set, conf: float = 0.5, imgsz: int = 640) -> int:
+    """
+    Label unlabeled images with the teacher's confident detections.
+
+    Args:
+        teacher: Trained teacher model
+        source_dir: Directory of unlabeled images
+        output_dir: Dataset directory (gets images/ and labels/)
+        skip: Image names that already have human labels
+        conf: Minimum teacher confidence for a pseudo-label
+        imgsz: Inference image size
+
+    Returns:
+        Number of pseudo-labeled images
+    """
+    images = sorted(p for p in source_dir.glob('*')
+                    if p.suffix.lower() in IMAGE_SUFFIXES and p.name not in skip)
+    count = 0
+    for image in images:
+        result = teacher(str(image), conf=conf, imgsz=imgsz, verbose=False)[0]
+        lines = [
+            f"{int(c)} {x:.6f} {y:.6f} {w:.6f} {h:.6f}"
+            for c, (x, y, w, h) in zip(result.boxes.cls.tolist(),
+                                       result.boxes.xywhn.tolist())
+        ]
+        link_file(image, output_dir / 'images' / image.name)
+        label = output_dir / 'labels' / f"{image.stem}.txt"
+        label.parent.mkdir(parents=True, exist_ok=True)
+        label.write_text("\n".join(lines) + ("\n" if lines else ""))
+        count += 1
+    return count
+
+
+def compress_model(
+    teacher_path: str = 'models/best.pt',
+    data_yaml: str = 'data_labeled/dataset.yaml',
+    unlabeled_dir: str = 'data_raw',
+    target_ms: float = 40.0,
+    imgsz: int = 640,
+    epochs: int = 30,
+    batch: int = 8,
+    pseudo_conf: float = 0.5,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+    output: str = 'models/compressed.pt',
+    name: str = 'compress'
+) -> dict:
+    """
+    Prune the teacher as lightly as the latency target allows, then fine-tune.
+
+    Args:
+        teacher_path: Trained model to compress
+        data_yaml: Labeled dataset YAML configuration
+        unlabeled_dir: Unlabeled images to pseudo-label with the teacher
+        target_ms: CPU latency target per imgsz tile (median, ms)
+        imgsz: Tile size
+        epochs: Fine-tuning epochs after pruning
+        batch: Batch size
+        pseudo_conf: Minimum teacher confidence for pseudo-labels
+        holdout_fraction: Images held out (by file name hash) for scoring
+        output: Where to save the compressed model
+        name: Run name under runs/compress/
+
+    Returns:
+        Report dict with teacher/pruned latency and held-out accuracy, or
+        None if no pruning ratio meets the target. If the teacher already
+        meets it, the teacher is copied to output and 'compressed' is False.
+    """
+    print("="*70)
+    print("AI TAKEOFF MVP - MODEL COMPRESSION")
+    print("="*70)
+
+    teacher_path = Path(teacher_path)
+    if not teacher_path.exists():
+        raise FileNotFoundError(f"Model not found: {teacher_path}")
+
+    teacher_latency = measure_latency(teacher_path, imgsz=imgsz)['median_ms']
+    print(f"\n👩‍🏫 Teacher: {teacher_path}")
+    print(f"   Latency: {teacher_latency:.1f} ms per {imgsz}px tile")
+    print(f"🎯 Target: {target_ms:.1f} ms")
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if teacher_latency <= target_ms:
+        print("\n✅ Teacher already meets the latency target, nothing to compress.")
+        shutil.copy(teacher_path, output)
+        print(f"💾 Teacher copied to: {output.absolute()}")
+        return {
+            'compressed': False,
+            'teacher_latency_ms': round(teacher_latency, 2),
+            'output': str(output),
+        }
+
+    work_dir = Path('runs/compress') / name
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+
+    # Score on the held-out split; fine-tune on the rest
+    split = build_holdout_dataset(str(data_yaml), output_dir=str(work_dir / 'data'),
+                                  holdout_fraction=holdout_fraction)
+    if not split['yaml']:
+        raise ValueError(
+            f"Held-out split ({holdout_fraction}) is empty; add labeled images or "
+            f"raise --holdout-fraction"
+        )
+    with open(split['yaml'], 'r') as f:
+        split_config = yaml.safe_load(f)
+    split_root = Path(split_config['path'])
+    manifest = load_manifest(teacher_path)
+    if manifest is None or not manifest_matches_split(manifest, holdout_fraction):
+        print(f"   ⚠️  Teacher was not trained with this held-out split; its held-out "
+              f"score is optimistic")
+
+    teacher = YOLO(str(teacher_path))
+    teacher_metrics = teacher.val(data=split['yaml'], imgsz=imgsz, batch=batch,
+                                  plots=False, verbose=False)
+    print(f"   Held-out mAP50: {teacher_metrics.box.map50:.3f} "
+          f"({len(split['holdout'])} image(s))")
+
+    # Fine-tuning data: human labels + teacher pseudo-labels on unlabeled sheets
+    labeled_names = {p.name for p in split['train'] + split['holdout']}
+    pseudo_dir = work_dir / 'pseudo'
+    pseudo_count = 0
+    if Path(unlabeled_dir).exists():
+        pseudo_count = pseudo_label(teacher, Path(unlabeled_dir), pseudo_dir,
+                                    skip=labeled_names, conf=pseudo_conf, imgsz=imgsz)
+    print(f"\n🏷️  Pseudo-labeled {pseudo_count} image(s) from {unlabeled_dir}/")
+
+    train_dirs = [str(split_root / split_config['train'])]
+    if pseudo_count:
+        train_dirs.append(str((pseudo_dir / 'images').resolve()))
+    finetune_yaml = work_dir / 'dataset.yaml'
+    with open(finetune_yaml, 'w') as f:
+        yaml.safe_dump({
+            'train': train_dirs,
+            'val': str(split_root / split_config['val']),
+            'names': split_config['names'],
+        }, f, sort_keys=False)
+
+    report = None
+    for ratio in PRUNE_RATIOS:
+        # Fresh unfused copy of the trained weights for every ratio
+        pruned = YOLO(str(teacher_path)).model
+        removed = prune_model(pruned, ratio)
+        pruned_path = save_checkpoint(pruned, work_dir / f"pruned_{int(ratio * 100)}.pt")
+        # Latency does not depend on fine-tuning, so rule out light ratios first
+        if measure_latency(pruned_path, imgsz=imgsz, runs=10)['median_ms'] > target_ms * 1.1:
+            print(f"   ⏭️  prune {ratio:.0%} ({removed} channels): too slow, skipping")
+            continue
+
+        print(f"\n✂️  Pruned {ratio:.0%} of prunable channels ({removed} removed); "
+              f"fine-tuning...")
+        student = YOLO(str(pruned_path))
+        student.train(
+            data=str(finetune_yaml),
+            trainer=PrunedModelTrainer,
+            epochs=epochs,
+            imgsz=imgsz,
+            batch=batch,
+            device='cpu',
+            # Recover from pruning without forgetting the teacher's weights
+            optimizer='AdamW',
+            lr0=0.001,
+            warmup_epochs=0,
+            project=str(work_dir),
+            name=f"p{int(ratio * 100)}",
+            exist_ok=True,
+            plots=False,
+            verbose=False
+        )
+
+        student_path = Path(student.trainer.save_dir) / 'weights' / 'best.pt'
+        latency = measure_latency(student_path, imgsz=imgsz)['median_ms']
+        metrics = YOLO(str(student_path)).val(data=split['yaml'], imgsz=imgsz,
+                                              batch=batch, plots=False, verbose=False)
+        report = {
+            'compressed': True,
+            'prune_ratio': ratio,
+            'channels_removed': removed,
+            'student': str(student_path),
+            'student_latency_ms': round(latency, 2),
+            'teacher_latency_ms': round(teacher_latency, 2),
+            'student_map50': float(metrics.box.map50),
+            'teacher_map50': float(teacher_metrics.box.map50),
+            'student_map50_95': float(metrics.box.map),
+            'teacher_map50_95': float(teacher_metrics.box.map),
+            'holdout_images': len(split['holdout']),
+        }
+        print(f"   Latency: {latency:.1f} ms, held-out mAP50: {metrics.box.map50:.3f}")
+        if latency <= target_ms:
+            break
+        print(f"   ⚠️  Still above target, pruning harder")
+
+    if report is None:
+        print(f"\n❌ Even {PRUNE_RATIOS[-1]:.0%} pruning does not meet the latency target.")
+        return None
+
+    shutil.copy(report['student'], output)
+    report['output'] = str(output)
+
+    print("\n" + "="*70)
+    print("📊 COMPRESSION REPORT")
+    print("="*70)
+    print(f"\nPruned: {report['prune_ratio']:.0%} of block-internal channels "
+          f"({report['channels_removed']} removed), fine-tuned {epochs} epochs")
+    print(f"Latency: {report['teacher_latency_ms']:.1f} ms → {report['student_latency_ms']:.1f} ms "
+          f"({report['teacher_latency_ms'] / report['student_latency_ms']:.1f}x faster)")
+    print(f"Held-out mAP50: {report['teacher_map50']:.3f} → {report['student_map50']:.3f} "
+          f"({report['student_map50'] - report['teacher_map50']:+.3f})")
+    print(f"Held-out mAP50-95: {report['teacher_map50_95']:.3f} → {report['student_map50_95']:.3f} "
+          f"({report['student_map50_95'] - report['teacher_map50_95']:+.3f})")
+    if report['student_latency_ms'] > target_ms:
+        print(f"\n⚠️  Heaviest pruning is still above the {target_ms:.1f} ms target")
+    print(f"\n💾 Compressed model saved to: {output.absolute()}")
+    print(f"   Use with: python scripts/inference.py --model {output}")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Prune and fine-tune the trained model to a CPU latency target'
+    )
+
+    parser.add_argument(
+        '--teacher',
+        type=str,
+        default='models/best.pt',
+        help='Trained model to compress'
+    )
+
+    parser.add_argument(
+        '--data',
+        type=str,
+        default='data_labeled/dataset.yaml',
+        help='Path to dataset YAML file'
+    )
+
+    parser.add_argument(
+        '--unlabeled',
+        type=str,
+        default='data_raw',
+        help='Unlabeled images to pseudo-label with the teacher'
+    )
+
+    parser.add_argument(
+        '--target-ms',
+        type=float,
+        default=40.0,
+        help='CPU latency target per tile in milliseconds'
+    )
+
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=640,
+        help='Tile size'
+    )
+
+    parser.add_argument(
+        '--epochs',
+        type=int,
+        default=30,
+        help='Fine-tuning epochs after pruning'
+    )
+
+    parser.add_argument(
+        '--batch',
+        type=int,
+        default=8,
+        help='Batch size'
+    )
+
+    parser.add_argument(
+        '--holdout-fraction',
+        type=float,
+        default=DEFAULT_HOLDOUT_FRACTION,
+        help='Fraction of images held out (by file name hash) for scoring'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='models/compressed.pt',
+        help='Where to save the compressed model'
+    )
+
+    args = parser.parse_args()
+
+    compress_model(
+        teacher_path=args.teacher,
+        data_yaml=args.data,
+        unlabeled_dir=args.unlabeled,
+        target_ms=args.target_ms,
+        imgsz=args.imgsz,
+        epochs=args.epochs,
+        batch=args.batch,
+        holdout_fraction=args.holdout_fraction,
+        output=args.output
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ Usage:
     python scripts/convert_pdf.py input.pdf
     python scripts/convert_pdf.py input.pdf --pages 1-5
     python scripts/convert_pdf.py --batch pdfs/
+    python scripts/convert_pdf.py input.pdf --dpi 600 --tile 640
 """
 
 import argparse
@@ -133,6 +134,76 @@ def convert_pdf_to_images(
         return False
 
 
+def convert_pdf_to_tiles(
+    pdf_path: str,
+    output_dir: str = "data_holding",
+    pages: str = None,
+    dpi: int = 300,
+    tile_size: int = 640,
+    overlap: int = 64,
+    format: str = "PNG"
+):
+    """
+    Convert PDF pages to overlapping tiles, rendering one band per tile row.
+    
+    Unlike convert_pdf_to_images, the full page is never rasterized: each
+    row of tiles is cut from a single full-width band, so large sheets can
+    be tiled at high DPI with a small memory footprint.
+    
+    Args:
+        pdf_path: Path to PDF file
+        output_dir: Directory to save tiles (holding area)
+        pages: Page range (e.g., "1-5" or "1,3,5")
+        dpi: Render resolution
+        tile_size: Tile edge in pixels
+        overlap: Overlap between neighbouring tiles in pixels
+        format: Output format (PNG or JPEG)
+    """
+    from pdf_regions import iter_tiles, page_count, parse_pages
+    
+    pdf_path = Path(pdf_path)
+    
+    if not pdf_path.exists():
+        print(f"❌ PDF not found: {pdf_path}")
+        return False
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    
+    print("="*70)
+    print("PDF TO TILES CONVERTER")
+    print("="*70)
+    print(f"\n📄 Input PDF: {pdf_path.name}")
+    print(f"📁 Output directory: {output_path}")
+    print(f"🎨 Resolution: {dpi} DPI")
+    print(f"🧩 Tiles: {tile_size}px, {overlap}px overlap")
+    
+    try:
+        page_numbers = parse_pages(pages, page_count(str(pdf_path)))
+        extension = 'png' if format == 'PNG' else 'jpg'
+        tile_count = 0
+        
+        for page in page_numbers:
+            page_tiles = 0
+            for x, y, tile in iter_tiles(str(pdf_path), page, dpi=dpi,
+                                         tile_size=tile_size, overlap=overlap):
+                output_file = output_path / f"{pdf_path.stem}_page_{page:03d}_x{x}_y{y}.{extension}"
+                Image.fromarray(tile).save(output_file, format)
+                page_tiles += 1
+            tile_count += page_tiles
+            print(f"   💾 Page {page}: {page_tiles} tile(s)")
+        
+        print(f"\n✅ Saved {tile_count} tile(s) from {len(page_numbers)} page(s)")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Error tiling PDF: {e}")
+        print("\nTroubleshooting:")
+        print("  • On Mac, install poppler: brew install poppler")
+        print("  • On Linux: sudo apt-get install poppler-utils")
+        return False
+
+
 def batch_convert(directory: str, output_dir: str = "data_holding", **kwargs):
     """Convert all PDFs in a directory"""
     dir_path = Path(directory)
@@ -150,11 +221,19 @@ def batch_convert(directory: str, output_dir: str = "data_holding", **kwargs):
     print(f"\n📁 Found {len(pdf_files)} PDF file(s)")
     print("="*70)
     
+    # Tile mode when a tile size is given; otherwise full pages
+    if kwargs.get('tile_size'):
+        convert = convert_pdf_to_tiles
+    else:
+        convert = convert_pdf_to_images
+        kwargs.pop('tile_size', None)
+        kwargs.pop('overlap', None)
+    
     success_count = 0
     
     for pdf_file in pdf_files:
         print(f"\n🔄 Processing: {pdf_file.name}")
-        if convert_pdf_to_images(str(pdf_file), output_dir, **kwargs):
+        if convert(str(pdf_file), output_dir, **kwargs):
             success_count += 1
     
     print("\n" + "="*70)
@@ -184,6 +263,9 @@ Examples:
   # High resolution output
   python scripts/convert_pdf.py blueprint.pdf --dpi 600
   
+  # Tile a large sheet at 600 DPI without rendering the full page
+  python scripts/convert_pdf.py blueprint.pdf --dpi 600 --tile 640
+  
   # Output to custom directory
   python scripts/convert_pdf.py blueprint.pdf --output my_holding_area/
         """
@@ -229,6 +311,19 @@ Examples:
         help='Output image format (default: PNG)'
     )
     
+    parser.add_argument(
+        '--tile',
+        type=int,
+        help='Save overlapping tiles of this size instead of full pages'
+    )
+    
+    parser.add_argument(
+        '--overlap',
+        type=int,
+        default=64,
+        help='Overlap between tiles in pixels (default: 64)'
+    )
+    
     args = parser.parse_args()
     
     # Check if batch mode
@@ -237,6 +332,18 @@ Examples:
             args.batch,
             output_dir=args.output,
             dpi=args.dpi,
+            format=args.format,
+            tile_size=args.tile,
+            overlap=args.overlap
+        )
+    elif args.pdf_path and args.tile:
+        convert_pdf_to_tiles(
+            args.pdf_path,
+            output_dir=args.output,
+            pages=args.pages,
+            dpi=args.dpi,
+            tile_size=args.tile,
+            overlap=args.overlap,
             format=args.format
         )
     elif args.pdf_path:
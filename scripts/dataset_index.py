@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Dataset Indexer and Label Validator for AI Takeoff MVP
+
+Scans labeled images and YOLO label files in parallel, validates every box
+against dataset.yaml, and computes per-class and per-size statistics. Results
+are cached in a manifest next to dataset.yaml keyed by file size/mtime, so
+repeat runs only rescan files that changed. Labels whose size/mtime changed are
+hashed, so a touched but unchanged label file is not rescanned.
+
+Polygon rows (class x1 y1 x2 y2 x3 y3 ...) are converted to their bounding box
+with a warning, the same way ultralytics trains a detector on them.
+
+Usage:
+    python scripts/dataset_index.py
+    python scripts/dataset_index.py --data data_labeled/dataset.yaml --rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from incremental import IMAGE_SUFFIXES, dataset_dirs
+
+
+INDEX_VERSION = 2
+# COCO size buckets on box area in pixels
+SMALL_AREA = 32 ** 2
+MEDIUM_AREA = 96 ** 2
+# Normalized coordinates may overshoot slightly from rounding in labeling tools
+EDGE_TOLERANCE = 1e-3
+
+
+def index_path_for(data_yaml: str) -> Path:
+    """data_labeled/dataset.yaml -> data_labeled/.dataset_index.json"""
+    return Path(data_yaml).parent / '.dataset_index.json'
+
+
+def _file_key(path: Path) -> list:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _label_hash(label: Path) -> str:
+    if not label.exists():
+        return None
+    return hashlib.sha1(label.read_bytes()).hexdigest()
+
+
+def polygon_to_box(coords: list) -> tuple:
+    """Bounding box (cx, cy, w, h) of normalized polygon points [x1, y1, x2, y2, ...]."""
+    xs, ys = coords[0::2], coords[1::2]
+    return ((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2,
+            max(xs) - min(xs), max(ys) - min(ys))
+
+
+def scan_entry(image: Path, label: Path, num_classes: int) -> dict:
+    """
+    Read one image header and its label file, validating every box.
+
+    Returns:
+        Entry dict with image size, boxes ([class, w_px, h_px]), errors
+        and warnings
+    """
+    entry = {
+        'image_key': _file_key(image),
+        'label_key': _file_key(label),
+        'label_hash': _label_hash(label),
+        'width': None,
+        'height': None,
+        'boxes': [],
+        'errors': [],
+        'warnings': [],
+    }
+
+    try:
+        with Image.open(image) as im:
+            entry['width'], entry['height'] = im.size  # header only, no decode
+    except Exception as e:
+        entry['errors'].append(f"unreadable image: {e}")
+        return entry
+
+    if entry['label_hash'] is None:
+        entry['warnings'].append("no label file (treated as background)")
+        return entry
+
+    for line_no, line in enumerate(label.read_text().splitlines(), start=1):
+        parts = line.split()
+        if not parts:
+            continue
+        where = f"{label.name}:{line_no}"
+        polygon = len(parts) > 5
+        if len(parts) < 5 or (polygon and len(parts) % 2 == 0):
+            entry['errors'].append(f"{where}: expected 5 values (or class + x y pairs), "
+                                   f"got {len(parts)}")
+            continue
+        try:
+            class_id = int(parts[0])
+            coords = list(map(float, parts[1:]))
+        except ValueError:
+            entry['errors'].append(f"{where}: non-numeric value in '{line.strip()}'")
+            continue
+        if polygon:
+            cx, cy, w, h = polygon_to_box(coords)
+            entry['warnings'].append(f"{where}: polygon with {len(coords) // 2} points "
+                                     f"converted to its bounding box")
+        else:
+            cx, cy, w, h = coords
+        if not 0 <= class_id < num_classes:
+            entry['errors'].append(f"{where}: class id {class_id} not in dataset.yaml "
+                                   f"(0-{num_classes - 1})")
+            continue
+        if w <= 0 or h <= 0:
+            entry['errors'].append(f"{where}: non-positive box size {w} x {h}")
+            continue
+        if (cx - w / 2 < -EDGE_TOLERANCE or cy - h / 2 < -EDGE_TOLERANCE
+                or cx + w / 2 > 1 + EDGE_TOLERANCE or cy + h / 2 > 1 + EDGE_TOLERANCE):
+            entry['errors'].append(f"{where}: box outside image (values must be "
+                                   f"normalized to 0-1)")
+            continue
+        entry['boxes'].append([class_id, w * entry['width'], h * entry['height']])
+
+    return entry
+
+
+def index_dataset(data_yaml: str = 'data_labeled/dataset.yaml', workers: int = None,
+                  rebuild: bool = False) -> dict:
+    """
+    Index and validate a YOLO dataset, rescanning only changed files.
+
+    Args:
+        data_yaml: Path to dataset YAML configuration
+        workers: Parallel scan threads (default: CPUs x 2, I/O bound)
+        rebuild: Ignore the cached manifest and rescan everything
+
+    Returns:
+        Dict with 'entries', 'stats', 'errors', 'warnings', 'orphan_labels'
+        and 'rescanned' (number of files scanned this run)
+    """
+    config, images_dir, labels_dir = dataset_dirs(data_yaml)
+    names = config.get('names', {})
+    num_classes = len(names)
+    if not images_dir.exists():
+        raise FileNotFoundError(f"Images directory not found: {images_dir}")
+
+    manifest_path = index_path_for(data_yaml)
+    cached = {}
+    if manifest_path.exists() and not rebuild:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        # Class list changes invalidate class-id validation
+        if manifest.get('version') == INDEX_VERSION and manifest.get('num_classes') == num_classes:
+            cached = manifest.get('entries', {})
+
+    images = sorted(p for p in images_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+
+    def refresh(image):
+        label = labels_dir / f"{image.stem}.txt"
+        entry = cached.get(image.name)
+        if entry and entry['image_key'] == _file_key(image):
+            label_key = _file_key(label)
+            if entry['label_key'] == label_key:
+                return image.name, entry, False
+            # Touched (e.g. re-saved or copied) but identical content
+            if label_key and entry['label_hash'] == _label_hash(label):
+                return image.name, {**entry, 'label_key': label_key}, False
+        return image.name, scan_entry(image, label, num_classes), True
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 2)) as pool:
+        scanned = list(pool.map(refresh, images))
+
+    entries = {name: entry for name, entry, _ in scanned}
+    rescanned = sum(1 for _, _, changed in scanned if changed)
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump({'version': INDEX_VERSION, 'num_classes': num_classes,
+                   'entries': entries}, f)
+
+    image_stems = {p.stem for p in images}
+    orphan_labels = sorted(p.name for p in labels_dir.glob('*.txt')
+                           if p.stem not in image_stems and p.name != 'classes.txt') \
+        if labels_dir.exists() else []
+
+    errors = [f"{name}: {e}" for name, entry in entries.items() for e in entry['errors']]
+    warnings = [f"{name}: {w}" for name, entry in entries.items() for w in entry['warnings']]
+    warnings += [f"{name}: label file without image" for name in orphan_labels]
+
+    return {
+        'entries': entries,
+        'stats': dataset_stats(entries, names),
+        'errors': errors,
+        'warnings': warnings,
+        'orphan_labels': orphan_labels,
+        'rescanned': rescanned,
+    }
+
+
+def dataset_stats(entries: dict, names: dict) -> dict:
+    """Per-class box/image counts and box size buckets."""
+    class_names = [names[i] for i in range(len(names))]
+    per_class = {
+        class_name: {'boxes': 0, 'images': 0, 'small': 0, 'medium': 0, 'large': 0}
+        for class_name in class_names
+    }
+    widths, heights = [], []
+    background = 0
+
+    for entry in entries.values():
+        if entry['width']:
+            widths.append(entry['width'])
+            heights.append(entry['height'])
+        if not entry['boxes']:
+            background += 1
+        seen = set()
+        for class_id, w, h in entry['boxes']:
+            class_name = class_names[class_id]
+            stats = per_class[class_name]
+            stats['boxes'] += 1
+            area = w * h
+            bucket = 'small' if area < SMALL_AREA else 'medium' if area < MEDIUM_AREA else 'large'
+            stats[bucket] += 1
+            if class_name not in seen:
+                stats['images'] += 1
+                seen.add(class_name)
+
+    return {
+        'images': len(entries),
+        'background_images': background,
+        'boxes': sum(s['boxes'] for s in per_class.values()),
+        'per_class': per_class,
+        'image_width_range': [min(widths), max(widths)] if widths else None,
+        'image_height_range': [min(heights), max(heights)] if heights else None,
+    }
+
+
+def print_index_report(index: dict, max_issues: int = 20):
+    """Print dataset statistics, then errors and warnings."""
+    stats = index['stats']
+    print(f"\n🗂️  Dataset index ({index['rescanned']} file(s) rescanned)")
+    print(f"   Images: {stats['images']} ({stats['background_images']} without boxes)")
+    print(f"   Boxes: {stats['boxes']}")
+    if stats['image_width_range']:
+        print(f"   Image sizes: {stats['image_width_range'][0]}-{stats['image_width_range'][1]} x "
+              f"{stats['image_height_range'][0]}-{stats['image_height_range'][1]} px")
+    for class_name, s in stats['per_class'].items():
+        print(f"   • {class_name}: {s['boxes']} boxes in {s['images']} images "
+              f"(small {s['small']}, medium {s['medium']}, large {s['large']})")
+
+    if index['warnings']:
+        print(f"\n⚠️  {len(index['warnings'])} warning(s):")
+        for warning in index['warnings'][:max_issues]:
+            print(f"   • {warning}")
+    if index['errors']:
+        print(f"\n❌ {len(index['errors'])} error(s):")
+        for error in index['errors'][:max_issues]:
+            print(f"   • {error}")
+        if len(index['errors']) > max_issues:
+            print(f"   ... and {len(index['errors']) - max_issues} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Index and validate a YOLO dataset before training'
+    )
+
+    parser.add_argument(
+        '--data',
+        type=str,
+        default='data_labeled/dataset.yaml',
+        help='Path to dataset YAML file'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Parallel scan threads'
+    )
+
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Ignore the cached manifest and rescan every file'
+    )
+
+    args = parser.parse_args()
+
+    index = index_dataset(args.data, workers=args.workers, rebuild=args.rebuild)
+    print_index_report(index)
+
+    if index['errors']:
+        raise SystemExit(1)
+    print("\n✅ Dataset is valid")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Accuracy + Speed Evaluation for AI Takeoff MVP
+
+Runs the detector over labeled images, matches predictions to the YOLO
+label files, and reports detection accuracy (precision, recall, mAP),
+counting accuracy (per-sheet count error) and throughput (images/sec)
+side by side, so every speed setting can be judged on both axes.
+
+Speed settings that can be judged:
+    --tile / --overlap   tiled detection with the same cross-tile merge as
+                         PDF inference (inference.detect_tiles)
+    --scale              downscale sheets first, e.g. 0.5 = half the DPI
+    --sheet-classifier   the sheet classifier cascade
+
+Throughput covers the per-image loop only; model load time is reported
+separately.
+
+Usage:
+    python scripts/evaluate.py --model models/best.pt
+    python scripts/evaluate.py --model models/best.pt models/compressed.pt --holdout 0.15
+    python scripts/evaluate.py --model models/best.pt --tile 640 --scale 0.5
+    python scripts/evaluate.py --model models/best.pt --conf 0.35 --output-json eval.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+from ultralytics import YOLO
+
+from dataset_index import polygon_to_box
+from incremental import IMAGE_SUFFIXES, dataset_dirs, is_holdout
+from inference import detect_tiles
+from pdf_regions import tile_grid
+
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU of two sets of xyxy boxes.
+
+    Args:
+        a: (N, 4) boxes
+        b: (M, 4) boxes
+
+    Returns:
+        (N, M) IoU matrix
+    """
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match_predictions(pred_cls: np.ndarray, true_cls: np.ndarray, iou: np.ndarray,
+                      thresholds: np.ndarray = IOU_THRESHOLDS) -> np.ndarray:
+    """
+    Greedy one-to-one matching of predictions to ground truth per IoU threshold.
+
+    Args:
+        pred_cls: (N,) predicted class ids
+        true_cls: (M,) ground-truth class ids
+        iou: (N, M) IoU matrix
+        thresholds: IoU thresholds
+
+    Returns:
+        (N, T) boolean true-positive matrix
+    """
+    correct = np.zeros((len(pred_cls), len(thresholds)), dtype=bool)
+    if len(pred_cls) == 0 or len(true_cls) == 0:
+        return correct
+    iou = iou * (pred_cls[:, None] == true_cls[None, :])
+    for t, threshold in enumerate(thresholds):
+        pi, ti = np.nonzero(iou >= threshold)
+        if len(pi) == 0:
+            continue
+        order = np.argsort(-iou[pi, ti], kind='stable')
+        pi, ti = pi[order], ti[order]
+        # Highest-IoU pair wins: each prediction and each label used once
+        _, first = np.unique(pi, return_index=True)
+        pi, ti = pi[first], ti[first]
+        order = np.argsort(-iou[pi, ti], kind='stable')
+        pi, ti = pi[order], ti[order]
+        _, first = np.unique(ti, return_index=True)
+        correct[pi[first], t] = True
+    return correct
+
+
+def average_precision(tp: np.ndarray, conf: np.ndarray, num_true: int) -> np.ndarray:
+    """
+    101-point interpolated AP for each IoU threshold.
+
+    Args:
+        tp: (N, T) true-positive matrix for one class
+        conf: (N,) prediction confidences
+        num_true: Number of ground-truth boxes of this class
+
+    Returns:
+        (T,) AP per IoU threshold
+    """
+    if num_true == 0 or len(tp) == 0:
+        return np.zeros(tp.shape[1])
+    order = np.argsort(-conf, kind='stable')
+    tpc = np.cumsum(tp[order], axis=0)
+    fpc = np.cumsum(~tp[order], axis=0)
+    recall = tpc / num_true
+    precision = tpc / (tpc + fpc)
+    grid = np.linspace(0, 1, 101)
+    ap = np.zeros(tp.shape[1])
+    for t in range(tp.shape[1]):
+        # Precision envelope, then sample at fixed recall points
+        envelope = np.flip(np.maximum.accumulate(np.flip(precision[:, t])))
+        idx = np.searchsorted(recall[:, t], grid, side='left')
+        ap[t] = np.where(idx < len(envelope), envelope[np.minimum(idx, len(envelope) - 1)], 0).mean()
+    return ap
+
+
+def load_labels(label_path: Path, width: int, height: int) -> tuple:
+    """
+    Read a YOLO label file as pixel xyxy boxes (polygons become their bounding box).
+
+    Returns:
+        (boxes (M, 4), class ids (M,))
+    """
+    rows = [line.split() for line in label_path.read_text().splitlines()] \
+        if label_path.exists() else []
+    rows = [[float(v) for v in row] for row in rows if row]
+    if not rows:
+        return np.zeros((0, 4)), np.zeros(0, dtype=int)
+    data = np.array([row if len(row) == 5 else [row[0], *polygon_to_box(row[1:])]
+                     for row in rows])
+    cls = data[:, 0].astype(int)
+    cx, cy = data[:, 1] * width, data[:, 2] * height
+    w, h = data[:, 3] * width, data[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    return boxes, cls
+
+
+def score_results(results: list, images: dict, labels_dir: Path, names: dict) -> dict:
+    """
+    Score detection results against YOLO label files.
+
+    Args:
+        results: Result dicts ({'filename', 'detections'}) as produced by
+            run_inference or detect_sheet
+        images: {filename: image path} of evaluated images
+        labels_dir: Directory of YOLO .txt labels
+        names: {class id: class name} from dataset.yaml
+
+    Returns:
+        Metrics dict including a per-sheet count table
+    """
+    name_to_id = {v: int(k) for k, v in names.items()}
+    all_tp, all_conf, all_cls, all_true_cls = [], [], [], []
+    sheets = []
+
+    for result in results:
+        image_path = images[result['filename']]
+        with Image.open(image_path) as im:
+            width, height = im.size
+        true_boxes, true_cls = load_labels(labels_dir / f"{image_path.stem}.txt", width, height)
+
+        dets = result['detections']
+        pred_boxes = np.array([d['bbox'] for d in dets], dtype=float).reshape(-1, 4)
+        pred_conf = np.array([d['confidence'] for d in dets], dtype=float)
+        pred_cls = np.array([name_to_id.get(d['class'], -1) for d in dets], dtype=int)
+
+        tp = match_predictions(pred_cls, true_cls, box_iou(pred_boxes, true_boxes))
+        all_tp.append(tp)
+        all_conf.append(pred_conf)
+        all_cls.append(pred_cls)
+        all_true_cls.append(true_cls)
+
+        sheets.append({
+            'sheet': result['filename'],
+            'true_count': int(len(true_cls)),
+            'pred_count': int(len(pred_cls)),
+            'count_error': int(len(pred_cls) - len(true_cls)),
+            'true_positives': int(tp[:, 0].sum()),
+        })
+
+    tp = np.concatenate(all_tp) if all_tp else np.zeros((0, len(IOU_THRESHOLDS)), bool)
+    conf = np.concatenate(all_conf) if all_conf else np.zeros(0)
+    pred_cls = np.concatenate(all_cls) if all_cls else np.zeros(0, int)
+    true_cls = np.concatenate(all_true_cls) if all_true_cls else np.zeros(0, int)
+
+    per_class = {}
+    for class_id, class_name in names.items():
+        class_id = int(class_id)
+        mask = pred_cls == class_id
+        num_true = int((true_cls == class_id).sum())
+        ap = average_precision(tp[mask], conf[mask], num_true)
+        per_class[class_name] = {
+            'labels': num_true,
+            'predictions': int(mask.sum()),
+            'AP50': float(ap[0]),
+            'AP50-95': float(ap.mean()),
+        }
+
+    classes_with_labels = [c for c in per_class.values() if c['labels'] > 0]
+    count_errors = np.array([s['count_error'] for s in sheets]) if sheets else np.zeros(0)
+    true_counts = np.array([s['true_count'] for s in sheets]) if sheets else np.zeros(0)
+    tp50 = int(tp[:, 0].sum())
+
+    return {
+        'images': len(results),
+        'labels': int(len(true_cls)),
+        'predictions': int(len(pred_cls)),
+        'precision': tp50 / max(len(pred_cls), 1),
+        'recall': tp50 / max(len(true_cls), 1),
+        'mAP50': float(np.mean([c['AP50'] for c in classes_with_labels])) if classes_with_labels else 0.0,
+        'mAP50-95': float(np.mean([c['AP50-95'] for c in classes_with_labels])) if classes_with_labels else 0.0,
+        'count_mae': float(np.abs(count_errors).mean()) if len(sheets) else 0.0,
+        'count_error_pct': float(np.abs(count_errors).sum() / max(true_counts.sum(), 1) * 100),
+        'per_class': per_class,
+        'sheets': sheets,
+    }
+
+
+def detect_sheet(model, image: np.ndarray, conf: float = 0.25, iou: float = 0.45,
+                 tile_size: int = None, tile_overlap: int = 64, tile_batch: int = 8) -> list:
+    """
+    Detect on one BGR sheet, whole or tiled.
+
+    Tiled detection uses the same cross-tile merge as PDF inference, so
+    tile sizes can be judged here on labeled rasters.
+
+    Returns:
+        List of detection dicts in image pixel coordinates
+    """
+    if not tile_size:
+        result = model(image, conf=conf, iou=iou, verbose=False)[0]
+        return [
+            {
+                'class': model.names[int(c)],
+                'confidence': float(p),
+                'bbox': [float(v) for v in box]
+            }
+            for box, p, c in zip(result.boxes.xyxy.tolist(), result.boxes.conf.tolist(),
+                                 result.boxes.cls.tolist())
+        ]
+
+    height, width = image.shape[:2]
+    rgb = image[..., ::-1]  # detect_tiles takes RGB tiles, like pdftoppm output
+    grid = tile_grid(width, height, tile_size, tile_overlap)
+    batches = (
+        [(x, y, rgb[y:y + h, x:x + w]) for x, y, w, h in grid[i:i + tile_batch]]
+        for i in range(0, len(grid), tile_batch)
+    )
+    return detect_tiles(model, batches, width, height, conf, iou)
+
+
+def evaluate_model(
+    model_path: str,
+    data_yaml: str = 'data_labeled/dataset.yaml',
+    holdout_fraction: float = None,
+    conf: float = 0.25,
+    iou: float = 0.45,
+    tile_size: int = None,
+    tile_overlap: int = 64,
+    tile_batch: int = 8,
+    scale: float = 1.0,
+    sheet_classifier: str = None
+) -> dict:
+    """
+    Run detection on labeled images and score accuracy and speed together.
+
+    Args:
+        model_path: Path to trained model (.pt file)
+        data_yaml: Labeled dataset YAML configuration
+        holdout_fraction: Evaluate only the hash-based held-out split
+            (same split as train.py --incremental); all images if None
+        conf: Confidence threshold (the operating point being judged)
+        iou: IoU threshold for NMS
+        tile_size: Detect on overlapping tiles of this size (whole image if None)
+        tile_overlap: Overlap between tiles in pixels
+        tile_batch: Tiles per detector call
+        scale: Downscale factor applied before detection (0.5 ~ half the
+            DPI); boxes are mapped back to label coordinates for scoring
+        sheet_classifier: Sheet classifier cascade to judge (skipped
+            sheets count as zero detections)
+
+    Returns:
+        Metrics dict (see score_results) plus 'load_seconds', 'seconds'
+        (per-image loop only) and 'images_per_sec'
+    """
+    config, images_dir, labels_dir = dataset_dirs(data_yaml)
+    images = sorted(p for p in images_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    if holdout_fraction:
+        images = [p for p in images if is_holdout(p.name, holdout_fraction)]
+    if not images:
+        raise ValueError(f"No labeled images to evaluate in {images_dir}")
+    if not Path(model_path).exists():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+
+    print(f"\n🔍 Evaluating {model_path} on {len(images)} image(s)"
+          + (f", {tile_size}px tiles" if tile_size else "")
+          + (f", scale {scale}" if scale != 1.0 else ""))
+
+    start = time.perf_counter()
+    model = YOLO(str(model_path))
+    classifier = None
+    if sheet_classifier:
+        from sheet_classifier import SheetClassifier
+
+        classifier = SheetClassifier(sheet_classifier)
+    # Warm up so one-time setup is not billed to the first image
+    model(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    start = time.perf_counter()
+    for image_path in images:
+        if classifier:
+            detect, reason = classifier.route(image_path.name, image_path)
+            if not detect:
+                results.append({'filename': image_path.name, 'skip_reason': reason,
+                                'detections': []})
+                continue
+        image = cv2.imread(str(image_path))
+        if image is None:
+            raise ValueError(f"Could not read image: {image_path}")
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        detections = detect_sheet(model, image, conf, iou, tile_size, tile_overlap, tile_batch)
+        for det in detections:
+            det['bbox'] = [v / scale for v in det['bbox']]
+        results.append({'filename': image_path.name, 'detections': detections})
+    elapsed = time.perf_counter() - start
+
+    metrics = score_results(results, {p.name: p for p in images}, labels_dir,
+                            config.get('names', {}))
+    metrics.update(
+        model=str(model_path),
+        sheet_classifier=sheet_classifier,
+        sheets_skipped=sum(1 for r in results if r.get('skip_reason')),
+        conf=conf,
+        iou=iou,
+        tile_size=tile_size,
+        tile_overlap=tile_overlap if tile_size else None,
+        scale=scale,
+        load_seconds=round(load_seconds, 2),
+        seconds=round(elapsed, 2),
+        images_per_sec=len(results) / max(elapsed, 1e-9),
+    )
+    return metrics
+
+
+def print_report(reports: list):
+    """Print accuracy and speed of each evaluated model side by side."""
+    print("\n" + "="*70)
+    print("📊 EVALUATION REPORT")
+    print("="*70)
+    print(f"\n{'model':<32}{'P':>7}{'R':>7}{'mAP50':>8}{'mAP50-95':>10}"
+          f"{'cnt MAE':>9}{'cnt err%':>10}{'img/s':>8}{'load s':>8}")
+    for r in reports:
+        print(f"{Path(r['model']).name:<32}{r['precision']:>7.3f}{r['recall']:>7.3f}"
+              f"{r['mAP50']:>8.3f}{r['mAP50-95']:>10.3f}{r['count_mae']:>9.2f}"
+              f"{r['count_error_pct']:>9.1f}%{r['images_per_sec']:>8.2f}{r['load_seconds']:>8.2f}")
+    settings = [f"conf {reports[0]['conf']}"] if reports else []
+    if reports and reports[0]['tile_size']:
+        settings.append(f"{reports[0]['tile_size']}px tiles, {reports[0]['tile_overlap']}px overlap")
+    if reports and reports[0]['scale'] != 1.0:
+        settings.append(f"scale {reports[0]['scale']}")
+    if settings:
+        print(f"\nSettings: {', '.join(settings)} (img/s excludes model load)")
+
+    for r in reports:
+        worst = sorted(r['sheets'], key=lambda s: -abs(s['count_error']))[:5]
+        if worst and worst[0]['count_error']:
+            print(f"\nLargest count errors ({Path(r['model']).name}):")
+            for s in worst:
+                if s['count_error']:
+                    print(f"   • {s['sheet']}: {s['pred_count']} counted, "
+                          f"{s['true_count']} labeled ({s['count_error']:+d})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Evaluate detection/counting accuracy and speed on labeled data'
+    )
+
+    parser.add_argument(
+        '--model',
+        type=str,
+        nargs='+',
+        default=['models/best.pt'],
+        help='Model(s) to evaluate'
+    )
+
+    parser.add_argument(
+        '--data',
+        type=str,
+        default='data_labeled/dataset.yaml',
+        help='Path to dataset YAML file'
+    )
+
+    parser.add_argument(
+        '--holdout',
+        type=float,
+        help='Evaluate only the held-out split of this fraction (e.g. 0.15)'
+    )
+
+    parser.add_argument(
+        '--conf',
+        type=float,
+        default=0.25,
+        help='Confidence threshold (0.0-1.0)'
+    )
+
+    parser.add_argument(
+        '--iou',
+        type=float,
+        default=0.45,
+        help='IoU threshold for NMS'
+    )
+
+    parser.add_argument(
+        '--tile',
+        type=int,
+        help='Detect on overlapping tiles of this size (default: whole image)'
+    )
+
+    parser.add_argument(
+        '--overlap',
+        type=int,
+        default=64,
+        help='Overlap between tiles in pixels'
+    )
+
+    parser.add_argument(
+        '--tile-batch',
+        type=int,
+        default=8,
+        help='Tiles per detector call'
+    )
+
+    parser.add_argument(
+        '--scale',
+        type=float,
+        default=1.0,
+        help='Downscale sheets before detection (0.5 ~ half the DPI)'
+    )
+
+    parser.add_argument(
+        '--sheet-classifier',
+        type=str,
+        help='Evaluate with the sheet classifier cascade in front of the detector'
+    )
+
+    parser.add_argument(
+        '--output-json',
+        type=str,
+        help='Path to save full metrics as JSON'
+    )
+
+    args = parser.parse_args()
+
+    reports = [
+        evaluate_model(
+            model,
+            data_yaml=args.data,
+            holdout_fraction=args.holdout,
+            conf=args.conf,
+            iou=args.iou,
+            tile_size=args.tile,
+            tile_overlap=args.overlap,
+            tile_batch=args.tile_batch,
+            scale=args.scale,
+            sheet_classifier=args.sheet_classifier
+        )
+        for model in args.model
+    ]
+
+    print_report(reports)
+
+    if args.output_json:
+        with open(args.output_json, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n💾 Metrics saved to: {args.output_json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Incremental Fine-Tuning Helpers for AI Takeoff MVP
+
+Tracks which labeled images the production model (models/best.pt) was
+trained on, and builds a small dataset of new images plus a replay sample
+of old ones for fine-tuning. Used by scripts/train.py --incremental.
+
+A fixed, hash-based held-out split is excluded from training in both full
+and incremental mode and recorded in the manifest, so the production model
+has never seen the images it is compared on.
+"""
+
+import hashlib
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+
+
+def manifest_path_for(model_path: str) -> Path:
+    """models/best.pt -> models/best_manifest.json"""
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}_manifest.json")
+
+
+def load_manifest(model_path: str) -> dict:
+    """
+    Load the training manifest stored next to a model.
+
+    Returns:
+        Manifest dict, or None if the model has no manifest
+    """
+    path = manifest_path_for(model_path)
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(model_path: str, images: list, **extra) -> Path:
+    """
+    Record the image names a model was trained on.
+
+    Args:
+        model_path: Path to the model the manifest describes
+        images: Image file names (or paths) used for training
+        **extra: Additional fields to store (metrics, base model, ...)
+    """
+    path = manifest_path_for(model_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'images': sorted(Path(i).name for i in images),
+        'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **extra
+    }
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+# Held-out split used by --incremental unless --holdout-fraction says otherwise
+DEFAULT_HOLDOUT_FRACTION = 0.15
+
+
+def is_holdout(image_name: str, holdout_fraction: float) -> bool:
+    """
+    Deterministic held-out split by file name hash, so the same images stay
+    held out across labeling sessions.
+    """
+    digest = hashlib.md5(Path(image_name).name.encode()).hexdigest()
+    return int(digest[:8], 16) / 0xFFFFFFFF < holdout_fraction
+
+
+def dataset_dirs(data_yaml: str) -> tuple:
+    """
+    Resolve the training images and labels directories of a dataset YAML.
+
+    Returns:
+        (config, images_dir, labels_dir)
+    """
+    data_path = Path(data_yaml)
+    with open(data_path, 'r') as f:
+        config = yaml.safe_load(f)
+    images_dir = data_path.parent / config.get('train', 'images')
+    # YOLO convention: .../images/x.png is labeled by .../labels/x.txt
+    labels_dir = images_dir.parent / 'labels' if images_dir.name == 'images' \
+        else images_dir.parent / images_dir.name.replace('images', 'labels')
+    return config, images_dir, labels_dir
+
+
+def manifest_matches_split(manifest: dict, holdout_fraction: float) -> bool:
+    """
+    True if the manifest's model was trained with the same held-out split,
+    i.e. none of the images held out at holdout_fraction were trained on.
+    """
+    if manifest.get('holdout_fraction') != holdout_fraction:
+        return False
+    return not any(is_holdout(name, holdout_fraction) for name in manifest.get('images', []))
+
+
+def link_file(src: Path, dst: Path):
+    """Symlink src to dst (copy where symlinks are unavailable)."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.symlink(src.resolve(), dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
+def build_incremental_dataset(
+    data_yaml: str,
+    manifest: dict,
+    output_dir: str,
+    replay_ratio: float = 2.0,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+    seed: int = 0
+) -> dict:
+    """
+    Build a fine-tuning dataset of new images plus a replay sample of old ones.
+
+    Args:
+        data_yaml: Full dataset YAML configuration
+        manifest: Manifest of the model being fine-tuned
+        output_dir: Directory for the generated dataset (recreated)
+        replay_ratio: Old images replayed per new image
+        holdout_fraction: Fraction of images held out for validation
+        seed: Random seed for the replay sample
+
+    Returns:
+        Dict with 'yaml' (path to generated dataset YAML) and the
+        'new', 'replay' and 'holdout' image lists
+    """
+    config, images_dir, labels_dir = dataset_dirs(data_yaml)
+    images = sorted(p for p in images_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    seen = set(manifest.get('images', []))
+
+    holdout = [p for p in images if is_holdout(p.name, holdout_fraction)]
+    trainable = [p for p in images if not is_holdout(p.name, holdout_fraction)]
+    new = [p for p in trainable if p.name not in seen]
+    old = [p for p in trainable if p.name in seen]
+
+    rng = random.Random(seed)
+    replay_count = min(len(old), int(round(len(new) * replay_ratio)))
+    replay = rng.sample(old, replay_count)
+
+    dataset_yaml = _write_split_dataset(config, labels_dir, output_dir, new + replay, holdout)
+
+    return {
+        'yaml': str(dataset_yaml),
+        'new': new,
+        'replay': replay,
+        'holdout': holdout,
+        'all_images': images,
+    }
+
+
+def build_holdout_dataset(data_yaml: str, output_dir: str,
+                          holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION) -> dict:
+    """
+    Build a full-training dataset with the hash-based held-out split as val.
+
+    Args:
+        data_yaml: Full dataset YAML configuration
+        output_dir: Directory for the generated dataset (recreated)
+        holdout_fraction: Fraction of images held out for validation
+
+    Returns:
+        Dict with 'yaml' (path to generated dataset YAML, None when the
+        held-out split is empty) and the 'train' and 'holdout' image lists
+    """
+    config, images_dir, labels_dir = dataset_dirs(data_yaml)
+    images = sorted(p for p in images_dir.glob('*') if p.suffix.lower() in IMAGE_SUFFIXES)
+    holdout = [p for p in images if is_holdout(p.name, holdout_fraction)]
+    train = [p for p in images if not is_holdout(p.name, holdout_fraction)]
+    if not holdout or not train:
+        return {'yaml': None, 'train': images, 'holdout': []}
+
+    dataset_yaml = _write_split_dataset(config, labels_dir, output_dir, train, holdout)
+    return {'yaml': str(dataset_yaml), 'train': train, 'holdout': holdout}
+
+
+def _write_split_dataset(config: dict, labels_dir: Path, output_dir: str,
+                         train: list, val: list) -> Path:
+    """Link train/val images and labels into output_dir and write its YAML."""
+    output_dir = Path(output_dir)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+
+    for split, split_images in (('train', train), ('val', val)):
+        for image in split_images:
+            link_file(image, output_dir / split / 'images' / image.name)
+            label = labels_dir / f"{image.stem}.txt"
+            if label.exists():
+                link_file(label, output_dir / split / 'labels' / label.name)
+
+    dataset_yaml = output_dir / 'dataset.yaml'
+    with open(dataset_yaml, 'w') as f:
+        yaml.safe_dump({
+            'path': str(output_dir.resolve()),
+            'train': 'train/images',
+            'val': 'val/images',
+            'names': config.get('names', {}),
+        }, f, sort_keys=False)
+    return dataset_yaml
@@ -7,14 +7,139 @@ Use this for batch processing or production deployments.
 Usage:
     python scripts/inference.py --image path/to/blueprint.png
     python scripts/inference.py --directory data_raw/ --output results.csv
+    python scripts/inference.py --pdf plans.pdf --pages 3-7 --dpi 600
 """
 
 import argparse
 from pathlib import Path
 from ultralytics import YOLO
 import cv2
+import numpy as np
 import pandas as pd
 import json
+import torch
+import torchvision
+
+from results_store import DEFAULT_DB_PATH, ResultsStore
+
+
+# Boxes this close (px) to a tile edge that lies inside the page are treated
+# as cut off by the tile
+TILE_EDGE_MARGIN = 2
+
+
+def merge_tile_detections(boxes, scores, classes, cut, iou: float = 0.45,
+                          containment: float = 0.7) -> torch.Tensor:
+    """
+    Merge detections from overlapping tiles into one set per page.
+    
+    Page-level NMS removes symbols seen whole in two tiles. A symbol cut by
+    a tile edge also leaves a partial box in one tile that overlaps the
+    whole box from its neighbour too little for IoU-based NMS; cut boxes
+    are therefore also dropped when mostly inside (intersection over the
+    smaller area >= containment) a kept box of the same class.
+    
+    Args:
+        boxes: Nx4 xyxy boxes in page coordinates
+        scores: N confidences
+        classes: N class ids
+        cut: N bools, True where the box touches an inner tile edge
+        iou: IoU threshold for page-level NMS
+        containment: Intersection-over-smaller-area threshold for cut boxes
+    
+    Returns:
+        Indices of the boxes to keep
+    """
+    keep = torchvision.ops.batched_nms(boxes, scores, classes.long(), iou)
+    b, c, k = boxes[keep], classes[keep], cut[keep]
+    area = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    lt = torch.max(b[:, None, :2], b[None, :, :2])
+    rb = torch.min(b[:, None, 2:], b[None, :, 2:])
+    inter = (rb - lt).clamp(min=0).prod(dim=2)
+    smaller = torch.min(area[:, None], area[None, :]).clamp(min=1e-9)
+    swallows = (inter / smaller >= containment) & (c[:, None] == c[None, :]) & k[None, :]
+    
+    # Whole boxes claim their fragments first, then larger fragments
+    order = sorted(range(len(b)), key=lambda i: (bool(k[i]), -float(area[i])))
+    suppressed = torch.zeros(len(b), dtype=torch.bool)
+    kept = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        kept.append(i)
+        suppressed |= swallows[i]
+    return keep[sorted(kept)]
+
+
+def detect_tiles(model, tile_batches, page_width: int, page_height: int,
+                 conf: float = 0.25, iou: float = 0.45) -> list:
+    """
+    Detect over batches of (x, y, tile) RGB tiles and merge across tiles.
+    
+    Returns:
+        List of detection dicts in page pixel coordinates
+    """
+    boxes, scores, classes, cut = [], [], [], []
+    for batch in tile_batches:
+        # Tiles are RGB; ultralytics expects BGR arrays
+        tiles = [np.ascontiguousarray(tile[..., ::-1]) for _, _, tile in batch]
+        results = model(tiles, conf=conf, iou=iou, verbose=False)
+        for (x, y, tile), result in zip(batch, results):
+            if len(result.boxes) == 0:
+                continue
+            h, w = tile.shape[:2]
+            xyxy = result.boxes.xyxy.cpu()
+            m = TILE_EDGE_MARGIN
+            cut.append(
+                ((xyxy[:, 0] <= m) & (x > 0))
+                | ((xyxy[:, 1] <= m) & (y > 0))
+                | ((xyxy[:, 2] >= w - m) & (x + w < page_width))
+                | ((xyxy[:, 3] >= h - m) & (y + h < page_height))
+            )
+            boxes.append(xyxy + torch.tensor([x, y, x, y], dtype=xyxy.dtype))
+            scores.append(result.boxes.conf.cpu())
+            classes.append(result.boxes.cls.cpu())
+    
+    if not boxes:
+        return []
+    
+    boxes, scores, classes, cut = torch.cat(boxes), torch.cat(scores), torch.cat(classes), torch.cat(cut)
+    keep = merge_tile_detections(boxes, scores, classes, cut, iou)
+    return [
+        {
+            'class': model.names[int(classes[i])],
+            'confidence': float(scores[i]),
+            'bbox': [float(v) for v in boxes[i].tolist()]
+        }
+        for i in keep.tolist()
+    ]
+
+
+def detect_pdf_page(
+    model,
+    pdf_path: str,
+    page: int,
+    dpi: int = 300,
+    tile_size: int = 640,
+    tile_overlap: int = 64,
+    tile_batch: int = 8,
+    conf: float = 0.25,
+    iou: float = 0.45
+) -> list:
+    """
+    Tiled detection over one PDF page, rendering tiles on demand.
+    
+    Boxes from overlapping tiles are merged with merge_tile_detections().
+    
+    Returns:
+        List of detection dicts in page pixel coordinates
+    """
+    from pdf_regions import iter_tile_batches, page_size_pixels
+    
+    page_width, page_height = page_size_pixels(pdf_path, page, dpi)
+    batches = iter_tile_batches(pdf_path, page, dpi=dpi, tile_size=tile_size,
+                                overlap=tile_overlap, batch_size=tile_batch)
+    return detect_tiles(model, batches, page_width, page_height, conf, iou)
 
 
 def run_inference(
@@ -25,10 +150,22 @@ def run_inference(
     iou: float = 0.45,
     save_images: bool = True,
     output_csv: str = None,
-    output_json: str = None
+    output_json: str = None,
+    results_db: str = None,
+    project: str = None,
+    model_version: str = None,
+    pdf_path: str = None,
+    pdf_pages: str = None,
+    dpi: int = 300,
+    tile_size: int = 640,
+    tile_overlap: int = 64,
+    tile_batch: int = 8,
+    sheet_classifier: str = None,
+    sheet_threshold: float = 0.5,
+    force_include: list = None
 ):
     """
-    Run inference on single image or directory of images.
+    Run inference on single image, directory of images, or PDF pages.
     
     Args:
         model_path: Path to trained model (.pt file)
@@ -39,6 +176,22 @@ def run_inference(
         save_images: Save annotated images
         output_csv: Path to save CSV results
         output_json: Path to save JSON results
+        results_db: Path to SQLite results store (skipped if None)
+        project: Project name recorded in the results store
+            (defaults to the image directory name)
+        model_version: Model version recorded in the results store
+            (derived from the weights file if None)
+        pdf_path: PDF to process page by page with tiled inference
+            (tiles are rendered on demand; no full-page raster is built)
+        pdf_pages: Page range for pdf_path (e.g., "1-5" or "1,3,5")
+        dpi: PDF render resolution
+        tile_size: Tile edge in pixels for PDF inference
+        tile_overlap: Overlap between PDF tiles in pixels
+        tile_batch: Tiles per detector call (bounds peak memory)
+        sheet_classifier: Sheet classifier run at low resolution first;
+            sheets it rejects skip detection (all sheets detected if None)
+        sheet_threshold: Minimum 'relevant' probability to run detection
+        force_include: File names or glob patterns always sent to detection
     """
     print("="*70)
     print("AI TAKEOFF MVP - INFERENCE SCRIPT")
@@ -54,6 +207,14 @@ def run_inference(
     print(f"✅ Model loaded successfully")
     print(f"   Classes: {model.names}")
     
+    classifier = None
+    if sheet_classifier:
+        from sheet_classifier import SheetClassifier
+        
+        classifier = SheetClassifier(sheet_classifier, threshold=sheet_threshold,
+                                     force_include=force_include)
+        print(f"   Sheet classifier: {sheet_classifier} (threshold {sheet_threshold})")
+    
     # Collect images to process
     images_to_process = []
     
@@ -72,8 +233,16 @@ def run_inference(
         images_to_process.extend(dir_path.glob('*.jpg'))
         images_to_process.extend(dir_path.glob('*.jpeg'))
     
-    if not images_to_process:
-        raise ValueError("No images to process. Specify --image or --directory")
+    pages_to_process = []
+    if pdf_path:
+        from pdf_regions import page_count, parse_pages
+        
+        if not Path(pdf_path).exists():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        pages_to_process = parse_pages(pdf_pages, page_count(pdf_path))
+    
+    if not images_to_process and not pages_to_process:
+        raise ValueError("No images to process. Specify --image, --directory or --pdf")
     
     print(f"\n📁 Processing {len(images_to_process)} image(s)...")
     print(f"   Confidence threshold: {conf}")
@@ -81,10 +250,27 @@ def run_inference(
     
     # Process images
     all_results = []
+    skipped_sheets = []
+    
+    def skip_sheet(name, reason):
+        print(f"   ⏭️  Skipped: {reason}\n")
+        skipped_sheets.append((name, reason))
+        all_results.append({
+            'filename': name,
+            'total_count': 0,
+            'skip_reason': reason,
+            'detections': []
+        })
     
     for img_path in images_to_process:
         print(f"🔍 Processing: {img_path.name}")
         
+        if classifier:
+            detect, reason = classifier.route(img_path.name, img_path)
+            if not detect:
+                skip_sheet(img_path.name, reason)
+                continue
+        
         # Run detection
         results = model(str(img_path), conf=conf, iou=iou, verbose=False)
         
@@ -124,6 +310,8 @@ def run_inference(
                 **class_counts,
                 'detections': detections
             }
+            if classifier:
+                result_data['skip_reason'] = ''
             all_results.append(result_data)
             
             # Save annotated image
@@ -136,6 +324,47 @@ def run_inference(
             
             print()
     
+    for page in pages_to_process:
+        page_name = f"{Path(pdf_path).stem}_page_{page:03d}"
+        print(f"🔍 Processing: {page_name} ({dpi} DPI, {tile_size}px tiles)")
+        
+        if classifier:
+            from sheet_classifier import render_pdf_thumbnail
+            
+            detect, reason = classifier.route(page_name, render_pdf_thumbnail(pdf_path, page))
+            if not detect:
+                skip_sheet(page_name, reason)
+                continue
+        
+        detections = detect_pdf_page(
+            model, pdf_path, page,
+            dpi=dpi,
+            tile_size=tile_size,
+            tile_overlap=tile_overlap,
+            tile_batch=tile_batch,
+            conf=conf,
+            iou=iou
+        )
+        
+        class_counts = {}
+        for det in detections:
+            class_counts[det['class']] = class_counts.get(det['class'], 0) + 1
+        
+        print(f"   ✅ Detected {len(detections)} objects")
+        for class_name, count in class_counts.items():
+            print(f"      • {class_name}: {count}")
+        print()
+        
+        page_result = {
+            'filename': page_name,
+            'total_count': len(detections),
+            **class_counts,
+            'detections': detections
+        }
+        if classifier:
+            page_result['skip_reason'] = ''
+        all_results.append(page_result)
+    
     # Display summary
     print("="*70)
     print("📊 SUMMARY")
@@ -144,6 +373,10 @@ def run_inference(
     total_objects = sum(r['total_count'] for r in all_results)
     print(f"\nTotal images processed: {len(all_results)}")
     print(f"Total objects detected: {total_objects}")
+    if classifier:
+        print(f"Sheets skipped by classifier: {len(skipped_sheets)}/{len(all_results)}")
+        for name, reason in skipped_sheets:
+            print(f"   • {name}: {reason}")
     
     # Aggregate class counts
     aggregate_counts = {}
@@ -158,7 +391,7 @@ def run_inference(
             print(f"   • {class_name}: {count}")
     
     # Save to CSV
-    if output_csv or directory_path:
+    if output_csv or directory_path or pdf_path:
         csv_path = output_csv or 'models/takeoff_results.csv'
         
         # Prepare DataFrame (exclude detections list for CSV)
@@ -174,6 +407,28 @@ def run_inference(
             json.dump(all_results, f, indent=2)
         print(f"💾 Detailed results saved to JSON: {output_json}")
     
+    # Save to results store
+    if results_db:
+        if project:
+            project_name = project
+        elif directory_path:
+            project_name = Path(directory_path).resolve().name
+        elif pdf_path and not image_path:
+            project_name = Path(pdf_path).stem
+        else:
+            project_name = Path(image_path).resolve().parent.name
+        with ResultsStore(results_db) as store:
+            run_id = store.write_run(
+                all_results,
+                project=project_name,
+                model_path=str(model_path),
+                model_version=model_version,
+                conf=conf,
+                iou=iou
+            )
+        print(f"💾 Run {run_id} recorded in results store: {results_db}")
+        print(f"   Project: {project_name}")
+    
     print("\n" + "="*70)
     
     return all_results
@@ -203,6 +458,66 @@ def main():
         help='Path to directory of images'
     )
     
+    parser.add_argument(
+        '--pdf',
+        type=str,
+        help='Path to PDF (tiled inference, tiles rendered on demand)'
+    )
+    
+    parser.add_argument(
+        '--pages',
+        type=str,
+        help='PDF page range (e.g., "1-5" or "3")'
+    )
+    
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=300,
+        help='PDF render resolution in DPI (default: 300)'
+    )
+    
+    parser.add_argument(
+        '--tile-size',
+        type=int,
+        default=640,
+        help='PDF tile size in pixels (default: 640)'
+    )
+    
+    parser.add_argument(
+        '--tile-overlap',
+        type=int,
+        default=64,
+        help='Overlap between PDF tiles in pixels (default: 64)'
+    )
+    
+    parser.add_argument(
+        '--tile-batch',
+        type=int,
+        default=8,
+        help='Tiles per detector call (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--sheet-classifier',
+        type=str,
+        help='Sheet classifier; sheets it rejects skip detection'
+    )
+    
+    parser.add_argument(
+        '--sheet-threshold',
+        type=float,
+        default=0.5,
+        help='Minimum relevant probability to run detection (default: 0.5)'
+    )
+    
+    parser.add_argument(
+        '--force-include',
+        type=str,
+        nargs='+',
+        help='File names or glob patterns always sent to detection'
+    )
+    
     parser.add_argument(
         '--conf',
         type=float,
@@ -235,10 +550,35 @@ def main():
         help='Path to save JSON results'
     )
     
+    parser.add_argument(
+        '--results-db',
+        type=str,
+        default=DEFAULT_DB_PATH,
+        help=f'SQLite results store (default: {DEFAULT_DB_PATH})'
+    )
+    
+    parser.add_argument(
+        '--no-store',
+        action='store_true',
+        help='Do not record the run in the results store'
+    )
+    
+    parser.add_argument(
+        '--project',
+        type=str,
+        help='Project name for the results store (default: image directory name)'
+    )
+    
+    parser.add_argument(
+        '--model-version',
+        type=str,
+        help='Model version label for the results store (default: hash of weights)'
+    )
+    
     args = parser.parse_args()
     
-    if not args.image and not args.directory:
-        parser.error("Must specify either --image or --directory")
+    if not args.image and not args.directory and not args.pdf:
+        parser.error("Must specify --image, --directory or --pdf")
     
     run_inference(
         model_path=args.model,
@@ -248,7 +588,19 @@ def main():
         iou=args.iou,
         save_images=not args.no_save_images,
         output_csv=args.output_csv,
-        output_json=args.output_json
+        output_json=args.output_json,
+        results_db=None if args.no_store else args.results_db,
+        project=args.project,
+        model_version=args.model_version,
+        pdf_path=args.pdf,
+        pdf_pages=args.pages,
+        dpi=args.dpi,
+        tile_size=args.tile_size,
+        tile_overlap=args.tile_overlap,
+        tile_batch=args.tile_batch,
+        sheet_classifier=args.sheet_classifier,
+        sheet_threshold=args.sheet_threshold,
+        force_include=args.force_include
     )
 
 
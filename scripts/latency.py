@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+CPU Latency Benchmark for AI Takeoff MVP
+
+Measures per-tile inference latency of a trained model on synthetic input,
+so models can be compared on speed independently of the dataset.
+
+Usage:
+    python scripts/latency.py --model models/best.pt
+    python scripts/latency.py --model models/best.pt --imgsz 640 --threads 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from ultralytics import YOLO
+
+
+def measure_latency(
+    model_path: str,
+    imgsz: int = 640,
+    runs: int = 20,
+    warmup: int = 3,
+    threads: int = None,
+    device: str = 'cpu'
+) -> dict:
+    """
+    Time single-tile inference (preprocess + forward + NMS).
+
+    Args:
+        model_path: Path to trained model (.pt file)
+        imgsz: Tile size in pixels
+        runs: Timed iterations
+        warmup: Untimed iterations before timing
+        threads: Torch CPU threads (torch default if None)
+        device: Device to run on
+
+    Returns:
+        Dict with 'mean_ms', 'median_ms', 'p90_ms' and 'tiles_per_sec'
+    """
+    if threads:
+        torch.set_num_threads(threads)
+
+    model = YOLO(str(model_path))
+    # Blank drawing sheet with a few strokes, so NMS sees realistic input
+    tile = np.full((imgsz, imgsz, 3), 255, dtype=np.uint8)
+    tile[imgsz // 4, :] = 0
+    tile[:, imgsz // 3] = 0
+
+    for _ in range(warmup):
+        model(tile, imgsz=imgsz, device=device, verbose=False)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(tile, imgsz=imgsz, device=device, verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    return {
+        'mean_ms': float(timings.mean()),
+        'median_ms': float(np.median(timings)),
+        'p90_ms': float(np.percentile(timings, 90)),
+        'tiles_per_sec': float(1000 / timings.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark CPU inference latency per tile'
+    )
+
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='models/best.pt',
+        help='Path to trained model'
+    )
+
+    parser.add_argument(
+        '--imgsz',
+        type=int,
+        default=640,
+        help='Tile size in pixels'
+    )
+
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=20,
+        help='Timed iterations'
+    )
+
+    parser.add_argument(
+        '--threads',
+        type=int,
+        help='Torch CPU threads (default: torch default)'
+    )
+
+    args = parser.parse_args()
+
+    stats = measure_latency(
+        args.model,
+        imgsz=args.imgsz,
+        runs=args.runs,
+        threads=args.threads
+    )
+
+    print(f"⏱️  {args.model} @ {args.imgsz}px")
+    print(f"   Mean: {stats['mean_ms']:.1f} ms")
+    print(f"   Median: {stats['median_ms']:.1f} ms")
+    print(f"   P90: {stats['p90_ms']:.1f} ms")
+    print(f"   Throughput: {stats['tiles_per_sec']:.1f} tiles/sec")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""
+Region-on-Demand PDF Rendering for AI Takeoff MVP
+
+Renders arbitrary sub-rectangles of a PDF page at a requested DPI using
+poppler's cropped rendering (pdftoppm -x/-y/-W/-H), so large sheets can be
+walked tile by tile without ever holding the full-page raster in memory.
+
+Tiles are cut from full-width bands, one pdftoppm call per tile row, so the
+page is parsed once per row rather than once per tile. A 36x48 inch sheet at
+600 DPI is ~1.8 GB as a full RGB page; a 640px band is ~41 MB.
+
+Usage:
+    from pdf_regions import page_count, page_size_pixels, iter_tile_batches
+
+    for batch in iter_tile_batches('plans.pdf', page=3, dpi=600, tile_size=640):
+        for x, y, tile in batch:
+            ...
+"""
+
+import io
+import re
+import shutil
+import subprocess
+
+import numpy as np
+from PIL import Image
+
+
+POINTS_PER_INCH = 72
+
+
+def _require_poppler():
+    for tool in ('pdftoppm', 'pdfinfo'):
+        if shutil.which(tool) is None:
+            raise RuntimeError(
+                f"'{tool}' not found. Install poppler "
+                "(Mac: brew install poppler, Linux: sudo apt-get install poppler-utils)"
+            )
+
+
+def _pdfinfo(pdf_path: str, page: int = None) -> str:
+    _require_poppler()
+    cmd = ['pdfinfo']
+    if page is not None:
+        cmd += ['-f', str(page), '-l', str(page)]
+    cmd.append(str(pdf_path))
+    return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+
+def page_count(pdf_path: str) -> int:
+    """Number of pages in a PDF."""
+    match = re.search(r'^Pages:\s+(\d+)', _pdfinfo(pdf_path), re.MULTILINE)
+    if not match:
+        raise ValueError(f"Could not read page count of {pdf_path}")
+    return int(match.group(1))
+
+
+def page_size_points(pdf_path: str, page: int) -> tuple:
+    """
+    Displayed size of a page in PDF points, accounting for page rotation.
+
+    Returns:
+        (width, height) in points
+    """
+    info = _pdfinfo(pdf_path, page)
+    size = re.search(rf'^Page\s+{page} size:\s+([\d.]+) x ([\d.]+)', info, re.MULTILINE)
+    if not size:
+        raise ValueError(f"Could not read size of page {page} in {pdf_path}")
+    width, height = float(size.group(1)), float(size.group(2))
+    rot = re.search(rf'^Page\s+{page} rot:\s+(\d+)', info, re.MULTILINE)
+    if rot and int(rot.group(1)) % 180 == 90:
+        width, height = height, width
+    return width, height
+
+
+def page_size_pixels(pdf_path: str, page: int, dpi: int) -> tuple:
+    """
+    Size of a page rendered at dpi (matches pdftoppm's rounding).
+
+    Returns:
+        (width, height) in pixels
+    """
+    width, height = page_size_points(pdf_path, page)
+    scale = dpi / POINTS_PER_INCH
+    return int(np.ceil(width * scale - 1e-6)), int(np.ceil(height * scale - 1e-6))
+
+
+def render_region(
+    pdf_path: str,
+    page: int,
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    dpi: int = 300,
+    gray: bool = False
+) -> np.ndarray:
+    """
+    Render one rectangle of a page without rasterizing the rest of it.
+
+    Args:
+        pdf_path: Path to PDF file
+        page: 1-based page number
+        x, y: Top-left corner in pixels at the given DPI
+        width, height: Region size in pixels
+        dpi: Render resolution
+        gray: Render single-channel grayscale
+
+    Returns:
+        HxWx3 RGB (or HxW grayscale) uint8 array
+    """
+    _require_poppler()
+    cmd = [
+        'pdftoppm',
+        '-f', str(page), '-l', str(page),
+        '-r', str(dpi),
+        '-x', str(int(x)), '-y', str(int(y)),
+        '-W', str(int(width)), '-H', str(int(height)),
+        '-singlefile',
+    ]
+    if gray:
+        cmd.append('-gray')
+    cmd += [str(pdf_path), '-']  # '-' streams the PPM/PGM to stdout
+    proc = subprocess.run(cmd, capture_output=True, check=True)
+    with Image.open(io.BytesIO(proc.stdout)) as im:
+        return np.asarray(im)
+
+
+def tile_grid(page_width: int, page_height: int, tile_size: int = 640,
+              overlap: int = 64) -> list:
+    """
+    Top-left corners of overlapping tiles covering a page.
+
+    The last row/column is shifted back so every tile is full size
+    (unless the page itself is smaller than a tile).
+
+    Returns:
+        List of (x, y, width, height) tuples
+    """
+    if overlap >= tile_size:
+        raise ValueError("overlap must be smaller than tile_size")
+    stride = tile_size - overlap
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, stride))
+        last = length - tile_size
+        # Within the overlap of the previous start: shift that tile to the
+        # edge instead of adding an almost identical one (overlap shrinks
+        # by less than the overlap, so neighbours still overlap)
+        if len(positions) > 1 and last - positions[-1] < overlap:
+            positions[-1] = last
+        else:
+            positions.append(last)
+        return positions
+
+    return [
+        (x, y, min(tile_size, page_width), min(tile_size, page_height))
+        for y in starts(page_height)
+        for x in starts(page_width)
+    ]
+
+
+def iter_tiles(pdf_path: str, page: int, dpi: int = 300, tile_size: int = 640,
+               overlap: int = 64, gray: bool = False):
+    """
+    Yield (x, y, tile) for every tile of a page, rendering one band per row.
+
+    Args:
+        pdf_path: Path to PDF file
+        page: 1-based page number
+        dpi: Render resolution
+        tile_size: Tile edge in pixels
+        overlap: Overlap between neighbouring tiles in pixels
+        gray: Render single-channel grayscale
+    """
+    page_width, page_height = page_size_pixels(pdf_path, page, dpi)
+    band, band_y = None, None
+    for x, y, w, h in tile_grid(page_width, page_height, tile_size, overlap):
+        if y != band_y:
+            band = render_region(pdf_path, page, 0, y, page_width, h, dpi=dpi, gray=gray)
+            band_y = y
+        yield x, y, band[:, x:x + w]
+
+
+def iter_tile_batches(pdf_path: str, page: int, dpi: int = 300, tile_size: int = 640,
+                      overlap: int = 64, batch_size: int = 8, gray: bool = False):
+    """
+    Yield lists of up to batch_size (x, y, tile) tuples; peak memory is one batch.
+    """
+    batch = []
+    for item in iter_tiles(pdf_path, page, dpi, tile_size, overlap, gray):
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_pages(pages: str, total: int) -> list:
+    """
+    Parse a page range like "3", "1-5" or "1,3,5" (None means all pages).
+
+    Returns:
+        Sorted list of 1-based page numbers
+    """
+    if not pages:
+        return list(range(1, total + 1))
+    result = set()
+    for part in pages.split(','):
+        if '-' in part:
+            first, last = map(int, part.split('-'))
+            result.update(range(first, last + 1))
+        else:
+            result.add(int(part))
+    return sorted(p for p in result if 1 <= p <= total)
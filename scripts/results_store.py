@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Takeoff Results Store for AI Takeoff MVP
+
+Keeps every inference run in a single indexed SQLite database so counts can
+be aggregated across projects, sheets, classes and model versions without
+re-parsing CSV files or re-running the detector.
+
+Totals count each sheet once: only the latest run of a sheet contributes, so
+re-running a job or running it with a second model does not inflate the
+numbers. Date filters select sheets whose latest run falls in the window;
+with a model version filter, the latest run of that model on each sheet
+counts. Use `compare` to see model versions side by side.
+
+The latest run is maintained as flags on sheet_counts when runs are written
+or deleted, so totals are a single indexed scan of current rows, not a
+search through every run.
+
+Usage:
+    python scripts/results_store.py totals --project "Main St Clinic"
+    python scripts/results_store.py totals --since 2026-07-01
+    python scripts/results_store.py compare --project "Main St Clinic"
+    python scripts/results_store.py runs
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+DEFAULT_DB_PATH = 'models/takeoff_results.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,
+    project       TEXT NOT NULL,
+    model_path    TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    conf          REAL,
+    iou           REAL,
+    created_at    TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS detections (
+    id            INTEGER PRIMARY KEY,
+    run_id        TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    project       TEXT NOT NULL,
+    sheet         TEXT NOT NULL,
+    class_name    TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    confidence    REAL NOT NULL,
+    x1            REAL NOT NULL,
+    y1            REAL NOT NULL,
+    x2            REAL NOT NULL,
+    y2            REAL NOT NULL
+);
+
+-- Every sheet processed by a run, including sheets with no detections, so
+-- the latest run of a sheet is known even when it counted nothing.
+CREATE TABLE IF NOT EXISTS run_sheets (
+    run_id        TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    project       TEXT NOT NULL,
+    sheet         TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    created_at    TEXT NOT NULL,
+    PRIMARY KEY (run_id, sheet)
+);
+
+-- Per-sheet, per-class counts written alongside the raw detections so
+-- aggregate queries never have to scan the detections table.
+CREATE TABLE IF NOT EXISTS sheet_counts (
+    run_id        TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    project       TEXT NOT NULL,
+    sheet         TEXT NOT NULL,
+    class_name    TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    count         INTEGER NOT NULL,
+    created_at    TEXT NOT NULL,
+    latest        INTEGER NOT NULL DEFAULT 0,  -- latest run of (project, sheet)
+    latest_model  INTEGER NOT NULL DEFAULT 0,  -- ... of (project, sheet, model_version)
+    PRIMARY KEY (run_id, sheet, class_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_project ON runs(project, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model_version);
+
+CREATE INDEX IF NOT EXISTS idx_det_run ON detections(run_id);
+CREATE INDEX IF NOT EXISTS idx_det_project_sheet ON detections(project, sheet);
+CREATE INDEX IF NOT EXISTS idx_det_class ON detections(class_name, model_version);
+
+CREATE INDEX IF NOT EXISTS idx_run_sheets_latest
+    ON run_sheets(project, sheet, created_at);
+CREATE INDEX IF NOT EXISTS idx_run_sheets_model
+    ON run_sheets(model_version, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_counts_sheet
+    ON sheet_counts(project, sheet);
+"""
+
+# Covering indexes over current rows only; created after databases from
+# before the latest flags have been migrated
+LATEST_INDEXES = """
+DROP INDEX IF EXISTS idx_counts_project;
+DROP INDEX IF EXISTS idx_counts_model;
+DROP INDEX IF EXISTS idx_counts_created;
+
+CREATE INDEX IF NOT EXISTS idx_counts_latest_class
+    ON sheet_counts(class_name, created_at, count) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_counts_latest_created
+    ON sheet_counts(created_at, class_name, count) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_counts_latest_project
+    ON sheet_counts(project, class_name, created_at, count) WHERE latest = 1;
+CREATE INDEX IF NOT EXISTS idx_counts_latest_model
+    ON sheet_counts(model_version, class_name, created_at, count) WHERE latest_model = 1;
+CREATE INDEX IF NOT EXISTS idx_counts_latest_compare
+    ON sheet_counts(project, sheet, class_name, model_version, count) WHERE latest_model = 1;
+"""
+
+# Recompute the latest flags of one sheet's counts from run_sheets (which also
+# knows runs that counted nothing on the sheet)
+REFRESH_LATEST = """
+UPDATE sheet_counts SET
+    latest = run_id = (
+        SELECT r.run_id FROM run_sheets r
+        WHERE r.project = sheet_counts.project AND r.sheet = sheet_counts.sheet
+        ORDER BY r.created_at DESC, r.rowid DESC LIMIT 1
+    ),
+    latest_model = run_id = (
+        SELECT r.run_id FROM run_sheets r
+        WHERE r.project = sheet_counts.project AND r.sheet = sheet_counts.sheet
+          AND r.model_version = sheet_counts.model_version
+        ORDER BY r.created_at DESC, r.rowid DESC LIMIT 1
+    )
+"""
+
+
+def model_version_for(model_path: str) -> str:
+    """
+    Derive a stable model version from the weights file contents.
+
+    Args:
+        model_path: Path to trained model (.pt file)
+
+    Returns:
+        "<stem>-<first 12 hex chars of sha1>", e.g. "best-3f2a9c01be7d"
+    """
+    model_path = Path(model_path)
+    digest = hashlib.sha1()
+    with open(model_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return f"{model_path.stem}-{digest.hexdigest()[:12]}"
+
+
+class ResultsStore:
+    """
+    SQLite-backed store of takeoff runs, detections and per-sheet counts.
+
+    Args:
+        db_path: Path to the SQLite database (created if missing)
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        # Databases written before run_sheets existed: derive it from counts
+        with self.conn:
+            if self.conn.execute("SELECT 1 FROM run_sheets LIMIT 1").fetchone() is None:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO run_sheets "
+                    "SELECT DISTINCT run_id, project, sheet, model_version, created_at "
+                    "FROM sheet_counts"
+                )
+        # Databases written before the latest flags existed: add and fill them
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sheet_counts)")}
+        if 'latest' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE sheet_counts "
+                                  "ADD COLUMN latest INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute("ALTER TABLE sheet_counts "
+                                  "ADD COLUMN latest_model INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute(REFRESH_LATEST)
+        self.conn.executescript(LATEST_INDEXES)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_run(
+        self,
+        results: list,
+        project: str,
+        model_path: str,
+        model_version: str = None,
+        conf: float = None,
+        iou: float = None,
+        run_id: str = None
+    ) -> str:
+        """
+        Write one inference run in a single transaction.
+
+        Args:
+            results: Result dicts as returned by run_inference
+            project: Project / job name the sheets belong to
+            model_path: Path to the model used for the run
+            model_version: Model version label (derived from weights if None)
+            conf: Confidence threshold used
+            iou: IoU threshold used
+            run_id: Explicit run id (a new UUID if None)
+
+        Returns:
+            The run id
+        """
+        run_id = run_id or uuid.uuid4().hex
+        model_version = model_version or model_version_for(model_path)
+        created_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+        detection_rows = []
+        count_rows = []
+        sheet_rows = []
+        for result in results:
+            sheet = result['filename']
+            sheet_rows.append((run_id, project, sheet, model_version, created_at))
+            class_counts = {}
+            for det in result['detections']:
+                x1, y1, x2, y2 = det['bbox']
+                detection_rows.append((
+                    run_id, project, sheet, det['class'], model_version,
+                    det['confidence'], x1, y1, x2, y2
+                ))
+                class_counts[det['class']] = class_counts.get(det['class'], 0) + 1
+            for class_name, count in class_counts.items():
+                count_rows.append((
+                    run_id, project, sheet, class_name, model_version,
+                    count, created_at
+                ))
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, project, str(model_path), model_version,
+                 conf, iou, created_at)
+            )
+            self.conn.executemany(
+                "INSERT INTO detections (run_id, project, sheet, class_name, "
+                "model_version, confidence, x1, y1, x2, y2) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                detection_rows
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO run_sheets VALUES (?, ?, ?, ?, ?)",
+                sheet_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO sheet_counts (run_id, project, sheet, class_name, "
+                "model_version, count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                count_rows
+            )
+            self._refresh_latest((project, row[2]) for row in sheet_rows)
+
+        return run_id
+
+    def _refresh_latest(self, sheets):
+        """Recompute latest flags for (project, sheet) pairs; call inside a transaction."""
+        self.conn.executemany(
+            REFRESH_LATEST + "WHERE project = ? AND sheet = ?",
+            sheets
+        )
+
+    @staticmethod
+    def _latest_filters(project=None, model_version=None, class_name=None,
+                        since=None, until=None, per_model=False) -> tuple:
+        """
+        WHERE clause (and params) selecting the sheet_counts rows of the
+        latest run of each sheet, or of each sheet and model version when
+        per_model or model_version is given.
+        """
+        per_model = per_model or model_version is not None
+        # Literal flag tests so SQLite can use the partial indexes
+        clauses = ["latest_model = 1" if per_model else "latest = 1"]
+        params = []
+        for column, value in (('project', project),
+                              ('model_version', model_version),
+                              ('class_name', class_name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return f"WHERE {' AND '.join(clauses)}", params
+
+    def class_totals(self, project=None, model_version=None, class_name=None,
+                     since=None, until=None) -> dict:
+        """
+        Total detections per class, counting each sheet once.
+
+        Only the latest run of each (project, sheet) contributes, so re-runs
+        do not add up. Pass model_version to total the latest run of that
+        model on each sheet instead.
+
+        Args:
+            project: Restrict to one project
+            model_version: Restrict to one model version
+            class_name: Restrict to one class
+            since: ISO date/time lower bound on the sheet's latest run (inclusive)
+            until: ISO date/time upper bound on the sheet's latest run (exclusive)
+
+        Returns:
+            {class_name: count}
+        """
+        where, params = self._latest_filters(project, model_version, class_name,
+                                             since, until)
+        rows = self.conn.execute(
+            f"SELECT class_name, SUM(count) FROM sheet_counts {where} "
+            f"GROUP BY class_name ORDER BY class_name",
+            params
+        )
+        return {class_name: total for class_name, total in rows}
+
+    def project_totals(self, class_name=None, model_version=None,
+                       since=None, until=None) -> list:
+        """
+        Total detections per project and class, counting each sheet once
+        (latest run per sheet, as in class_totals).
+
+        Returns:
+            List of (project, class_name, count) tuples
+        """
+        where, params = self._latest_filters(None, model_version, class_name,
+                                             since, until)
+        return self.conn.execute(
+            f"SELECT project, class_name, SUM(count) FROM sheet_counts {where} "
+            f"GROUP BY project, class_name ORDER BY project, class_name",
+            params
+        ).fetchall()
+
+    def sheet_counts(self, project: str, run_id: str = None) -> list:
+        """
+        Per-sheet counts for a project (latest run if run_id is None).
+
+        Returns:
+            List of (sheet, class_name, count) tuples
+        """
+        if run_id is None:
+            row = self.conn.execute(
+                "SELECT run_id FROM runs WHERE project = ? "
+                "ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                (project,)
+            ).fetchone()
+            if row is None:
+                return []
+            run_id = row[0]
+        return self.conn.execute(
+            "SELECT sheet, class_name, count FROM sheet_counts "
+            "WHERE run_id = ? ORDER BY sheet, class_name",
+            (run_id,)
+        ).fetchall()
+
+    def compare_model_versions(self, project: str = None,
+                               class_name: str = None) -> list:
+        """
+        Side-by-side counts per sheet for every model version.
+
+        Only the latest run of each model version on a sheet is counted, so
+        re-running the same model does not double its numbers.
+
+        Returns:
+            List of (project, sheet, class_name, model_version, count) tuples
+        """
+        where, params = self._latest_filters(project, None, class_name, per_model=True)
+        return self.conn.execute(
+            f"""
+            SELECT project, sheet, class_name, model_version, count
+            FROM sheet_counts {where}
+            ORDER BY project, sheet, class_name, model_version
+            """,
+            params
+        ).fetchall()
+
+    def runs(self, project: str = None) -> list:
+        """
+        List recorded runs, newest first.
+
+        Returns:
+            List of (run_id, project, model_version, created_at, detections)
+        """
+        where = "WHERE r.project = ?" if project is not None else ""
+        params = [project] if project is not None else []
+        return self.conn.execute(
+            f"""
+            SELECT r.run_id, r.project, r.model_version, r.created_at,
+                   COALESCE((SELECT SUM(count) FROM sheet_counts c
+                             WHERE c.run_id = r.run_id), 0)
+            FROM runs r {where}
+            ORDER BY r.created_at DESC, r.rowid DESC
+            """,
+            params
+        ).fetchall()
+
+    def delete_run(self, run_id: str):
+        with self.conn:
+            sheets = self.conn.execute(
+                "SELECT project, sheet FROM run_sheets WHERE run_id = ?", (run_id,)
+            ).fetchall()
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            # The previous run of each sheet becomes the latest again
+            self._refresh_latest(sheets)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Query the takeoff results store'
+    )
+
+    parser.add_argument(
+        '--db',
+        type=str,
+        default=DEFAULT_DB_PATH,
+        help=f'Path to results database (default: {DEFAULT_DB_PATH})'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    totals = subparsers.add_parser('totals', help='Total counts per class')
+    totals.add_argument('--project', type=str, help='Restrict to one project')
+    totals.add_argument('--model-version', type=str, help='Restrict to one model version')
+    totals.add_argument('--class-name', type=str, help='Restrict to one class')
+    totals.add_argument('--since', type=str, help='ISO date lower bound (e.g. 2026-07-01)')
+    totals.add_argument('--until', type=str, help='ISO date upper bound (exclusive)')
+    totals.add_argument('--by-project', action='store_true', help='Break totals down by project')
+
+    compare = subparsers.add_parser('compare', help='Compare model versions per sheet')
+    compare.add_argument('--project', type=str, help='Restrict to one project')
+    compare.add_argument('--class-name', type=str, help='Restrict to one class')
+
+    runs = subparsers.add_parser('runs', help='List recorded runs')
+    runs.add_argument('--project', type=str, help='Restrict to one project')
+
+    args = parser.parse_args()
+
+    with ResultsStore(args.db) as store:
+        if args.command == 'totals':
+            if args.by_project:
+                rows = store.project_totals(
+                    class_name=args.class_name,
+                    model_version=args.model_version,
+                    since=args.since,
+                    until=args.until
+                )
+                for project, class_name, count in rows:
+                    print(f"{project}\t{class_name}\t{count}")
+            else:
+                totals = store.class_totals(
+                    project=args.project,
+                    model_version=args.model_version,
+                    class_name=args.class_name,
+                    since=args.since,
+                    until=args.until
+                )
+                for class_name, count in totals.items():
+                    print(f"{class_name}\t{count}")
+        elif args.command == 'compare':
+            for row in store.compare_model_versions(args.project, args.class_name):
+                print("\t".join(str(v) for v in row))
+        elif args.command == 'runs':
+            for row in store.runs(args.project):
+                print("\t".join(str(v) for v in row))
+
+
+if __name__ == '__main__':
+    main()
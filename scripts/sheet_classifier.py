@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Sheet Classifier Cascade for AI Takeoff MVP
+
+A small low-resolution image classifier that decides whether a sheet is
+worth running the detector on. Cover sheets, schedules, details and other
+plans without target objects are skipped before full-resolution detection.
+
+Training data is whole sheets with page-level labels, kept separate from the
+detector's box labels in data_sheets/sheet_labels.csv:
+
+    sheet,label
+    A-001_cover.png,skip
+    E-201_power_plan.png,relevant
+
+Sheets are looked up in data_raw/ and the labeled images directory. Tiles
+(names ending in _x<N>_y<N>, from convert_pdf.py --tile) are never used:
+an outlet-free tile says nothing about its sheet. `init` writes a starting
+CSV that marks sheets with labeled boxes as relevant and leaves the rest for
+you to fill in.
+
+Usage:
+    python scripts/sheet_classifier.py init
+    python scripts/sheet_classifier.py train --epochs 30
+    python scripts/sheet_classifier.py classify --directory data_raw/
+"""
+
+import argparse
+import csv
+import fnmatch
+import re
+import shutil
+from pathlib import Path
+
+import cv2
+from ultralytics import YOLO
+
+from incremental import IMAGE_SUFFIXES, dataset_dirs, is_holdout, link_file
+
+
+DEFAULT_CLASSIFIER_PATH = 'models/sheet_classifier.pt'
+DEFAULT_SHEET_LABELS = 'data_sheets/sheet_labels.csv'
+RELEVANT = 'relevant'
+SKIP = 'skip'
+TILE_NAME = re.compile(r'_x\d+_y\d+$')
+
+
+def sheet_dirs(data_yaml: str, raw_dir: str = 'data_raw') -> list:
+    """Directories searched for whole sheets named in the labels CSV."""
+    _, images_dir, _ = dataset_dirs(data_yaml)
+    return [Path(raw_dir), images_dir]
+
+
+def is_tile(image: Path) -> bool:
+    return bool(TILE_NAME.search(Path(image).stem))
+
+
+def init_sheet_labels(data_yaml: str = 'data_labeled/dataset.yaml', raw_dir: str = 'data_raw',
+                      labels_csv: str = DEFAULT_SHEET_LABELS) -> Path:
+    """
+    Write a sheet labels CSV listing every whole sheet, keeping existing labels.
+
+    Sheets with at least one labeled box are pre-filled as relevant; the
+    rest are left blank to be labeled by hand.
+    """
+    labels_csv = Path(labels_csv)
+    existing = {}
+    if labels_csv.exists():
+        with open(labels_csv, newline='') as f:
+            existing = {row['sheet']: row['label'] for row in csv.DictReader(f)}
+
+    _, _, labels_dir = dataset_dirs(data_yaml)
+    rows = {}
+    for directory in sheet_dirs(data_yaml, raw_dir):
+        for image in sorted(directory.glob('*')):
+            if image.suffix.lower() not in IMAGE_SUFFIXES or is_tile(image):
+                continue
+            label = labels_dir / f"{image.stem}.txt"
+            has_boxes = label.exists() and bool(label.read_text().strip())
+            rows.setdefault(image.name, RELEVANT if has_boxes else '')
+    rows.update(existing)
+
+    labels_csv.parent.mkdir(parents=True, exist_ok=True)
+    with open(labels_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['sheet', 'label'])
+        writer.writerows(sorted(rows.items()))
+    unlabeled = sum(1 for label in rows.values() if not label)
+    print(f"📝 {labels_csv}: {len(rows)} sheet(s), {unlabeled} still to label "
+          f"({RELEVANT}/{SKIP})")
+    return labels_csv
+
+
+def collect_sheets(labels_csv: str, search_dirs: list) -> dict:
+    """
+    Resolve page-level sheet labels to image paths.
+
+    Returns:
+        {'relevant': [paths], 'skip': [paths]}
+    """
+    if not Path(labels_csv).exists():
+        raise FileNotFoundError(
+            f"Sheet labels not found: {labels_csv} (create it with "
+            f"'python scripts/sheet_classifier.py init')"
+        )
+    sheets = {RELEVANT: [], SKIP: []}
+    with open(labels_csv, newline='') as f:
+        for row in csv.DictReader(f):
+            label = (row.get('label') or '').strip().lower()
+            if not label:
+                continue
+            if label not in sheets:
+                print(f"   ⚠️  {row['sheet']}: unknown label '{label}' (use {RELEVANT}/{SKIP})")
+                continue
+            if is_tile(Path(row['sheet'])):
+                print(f"   ⚠️  {row['sheet']}: tile, not a whole sheet - ignored")
+                continue
+            image = next((d / row['sheet'] for d in search_dirs
+                          if (d / row['sheet']).exists()), None)
+            if image is None:
+                print(f"   ⚠️  {row['sheet']}: not found in "
+                      f"{', '.join(str(d) for d in search_dirs)}")
+                continue
+            sheets[label].append(image)
+    return sheets
+
+
+def train_sheet_classifier(
+    labels_csv: str = DEFAULT_SHEET_LABELS,
+    data_yaml: str = 'data_labeled/dataset.yaml',
+    raw_dir: str = 'data_raw',
+    imgsz: int = 224,
+    epochs: int = 20,
+    batch: int = 16,
+    output: str = DEFAULT_CLASSIFIER_PATH
+) -> Path:
+    """
+    Train the relevant/skip sheet classifier (YOLOv8n-cls at low resolution).
+
+    Args:
+        labels_csv: Page-level sheet labels (sheet,label)
+        data_yaml: Labeled dataset YAML (its images are searched for sheets)
+        raw_dir: Directory of raw sheets searched for sheets
+        imgsz: Classifier input size
+        epochs: Training epochs
+        batch: Batch size
+        output: Where to save the classifier
+
+    Returns:
+        Path to the saved classifier
+    """
+    print("="*70)
+    print("AI TAKEOFF MVP - SHEET CLASSIFIER TRAINING")
+    print("="*70)
+
+    sheets = collect_sheets(labels_csv, sheet_dirs(data_yaml, raw_dir))
+    print(f"\n📋 Relevant sheets: {len(sheets[RELEVANT])}")
+    print(f"   Skip sheets: {len(sheets[SKIP])}")
+    if not sheets[RELEVANT] or not sheets[SKIP]:
+        raise ValueError(
+            f"Need examples of both {RELEVANT} and {SKIP} sheets in {labels_csv}"
+        )
+
+    # ultralytics classification layout: <root>/<split>/<class>/<image>
+    data_dir = Path('runs/sheet_classifier/data')
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+    for class_name, images in sheets.items():
+        val = [image for image in images if is_holdout(image.name, 0.2)]
+        train = [image for image in images if not is_holdout(image.name, 0.2)]
+        # Both splits need every class; move a sheet rather than share one,
+        # so validation never scores a sheet the model trained on
+        if len(images) < 2:
+            raise ValueError(
+                f"Need at least 2 {class_name} sheets (one to train, one to "
+                f"validate); label more in {labels_csv}"
+            )
+        if not val:
+            val.append(train.pop())
+        elif not train:
+            train.append(val.pop())
+        for split, split_images in (('train', train), ('val', val)):
+            for image in split_images:
+                link_file(image, data_dir / split / class_name / image.name)
+
+    model = YOLO('yolov8n-cls.pt')
+    model.train(
+        data=str(data_dir.resolve()),
+        epochs=epochs,
+        imgsz=imgsz,
+        batch=batch,
+        device='cpu',
+        project='runs/sheet_classifier',
+        name='train',
+        exist_ok=True,
+        plots=False,
+        verbose=False
+    )
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(Path(model.trainer.save_dir) / 'weights' / 'best.pt', output)
+    print(f"\n💾 Sheet classifier saved to: {output.absolute()}")
+    return output
+
+
+class SheetClassifier:
+    """
+    Routes sheets to the detector or skips them, with a reason for each skip.
+
+    Args:
+        model_path: Trained sheet classifier
+        threshold: Minimum 'relevant' probability to run detection
+        force_include: File names or glob patterns that always run detection
+        imgsz: Classifier input size
+    """
+
+    def __init__(self, model_path: str = DEFAULT_CLASSIFIER_PATH, threshold: float = 0.5,
+                 force_include: list = None, imgsz: int = 224):
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Sheet classifier not found: {model_path}")
+        self.model = YOLO(str(model_path))
+        self.threshold = threshold
+        self.force_include = list(force_include or [])
+        self.imgsz = imgsz
+        self.relevant_id = {v: k for k, v in self.model.names.items()}[RELEVANT]
+
+    def relevant_probability(self, image) -> float:
+        """P(relevant) for a path or BGR array."""
+        if isinstance(image, (str, Path)):
+            # Decode at reduced size: the classifier never needs full resolution
+            image = cv2.imread(str(image), cv2.IMREAD_REDUCED_COLOR_4)
+        result = self.model(image, imgsz=self.imgsz, verbose=False)[0]
+        return float(result.probs.data[self.relevant_id])
+
+    def is_forced(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.force_include)
+
+    def route(self, name: str, image) -> tuple:
+        """
+        Decide whether a sheet goes to the detector.
+
+        Args:
+            name: Sheet name (matched against force_include)
+            image: Path or BGR array (low resolution is fine)
+
+        Returns:
+            (detect, reason) - reason is None when the sheet is detected
+        """
+        if self.is_forced(name):
+            return True, None
+        prob = self.relevant_probability(image)
+        if prob >= self.threshold:
+            return True, None
+        return False, f"classified as {SKIP} (p_relevant={prob:.2f} < {self.threshold})"
+
+
+def render_pdf_thumbnail(pdf_path: str, page: int, dpi: int = 24):
+    """Whole page at thumbnail resolution as a BGR array, for the classifier."""
+    from pdf_regions import page_size_pixels, render_region
+
+    width, height = page_size_pixels(pdf_path, page, dpi)
+    return render_region(pdf_path, page, 0, 0, width, height, dpi=dpi)[..., ::-1].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Train or run the sheet classifier cascade'
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init = subparsers.add_parser('init', help='Write or extend the sheet labels CSV')
+    train = subparsers.add_parser('train', help='Train the sheet classifier')
+    for sub in (init, train):
+        sub.add_argument('--labels', type=str, default=DEFAULT_SHEET_LABELS,
+                         help=f'Page-level sheet labels CSV (default: {DEFAULT_SHEET_LABELS})')
+        sub.add_argument('--data', type=str, default='data_labeled/dataset.yaml',
+                         help='Path to dataset YAML file (its images are searched for sheets)')
+        sub.add_argument('--raw', type=str, default='data_raw',
+                         help='Directory of raw sheets')
+    train.add_argument('--imgsz', type=int, default=224, help='Classifier input size')
+    train.add_argument('--epochs', type=int, default=20, help='Training epochs')
+    train.add_argument('--output', type=str, default=DEFAULT_CLASSIFIER_PATH,
+                       help=f'Where to save the classifier (default: {DEFAULT_CLASSIFIER_PATH})')
+
+    classify = subparsers.add_parser('classify', help='Show routing for a directory')
+    classify.add_argument('--directory', type=str, required=True, help='Directory of images')
+    classify.add_argument('--classifier', type=str, default=DEFAULT_CLASSIFIER_PATH,
+                          help='Path to sheet classifier')
+    classify.add_argument('--threshold', type=float, default=0.5,
+                          help='Minimum relevant probability to run detection')
+
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        init_sheet_labels(data_yaml=args.data, raw_dir=args.raw, labels_csv=args.labels)
+    elif args.command == 'train':
+        train_sheet_classifier(
+            labels_csv=args.labels,
+            data_yaml=args.data,
+            raw_dir=args.raw,
+            imgsz=args.imgsz,
+            epochs=args.epochs,
+            output=args.output
+        )
+    elif args.command == 'classify':
+        classifier = SheetClassifier(args.classifier, threshold=args.threshold)
+        images = sorted(p for p in Path(args.directory).glob('*')
+                        if p.suffix.lower() in IMAGE_SUFFIXES)
+        for image in images:
+            detect, reason = classifier.route(image.name, image)
+            print(f"{'✅ detect' if detect else '⏭️  skip  '}  {image.name}"
+                  + (f"  - {reason}" if reason else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter Sweep Runner for AI Takeoff MVP
+
+Trains several YOLOv8 trials concurrently in a process pool, prunes trials
+that fall clearly behind after a few epochs, and ranks the surviving models
+by accuracy and CPU inference latency. Latency is benchmarked serially after
+all training has finished, so it is not skewed by concurrent trials.
+
+Every trial trains without the hash-based held-out split and validates on
+it (the same split as train.py --incremental), so pruning and ranking use
+accuracy on unseen images, not on the training set.
+
+Usage:
+    python scripts/sweep.py --epochs 10 20 --imgsz 480 640 --parallel 4
+    python scripts/sweep.py --imgsz 416 640 --mosaic 0 1.0 --target-map50 0.9
+"""
+
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from incremental import DEFAULT_HOLDOUT_FRACTION, build_holdout_dataset
+from latency import measure_latency
+
+
+# Trial knobs passed straight through to model.train()
+SEARCH_KEYS = ('epochs', 'imgsz', 'patience', 'mosaic', 'fliplr', 'degrees', 'scale')
+
+
+def _init_worker(threads: int):
+    """Limit each trial process to its share of the CPU."""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _should_prune(history, trial_id, epoch, fitness, prune_after, min_trials, margin):
+    """
+    Median rule: after prune_after epochs, stop a trial whose fitness is
+    below (1 - margin) x the median of other trials at the same epoch.
+    """
+    if epoch < prune_after:
+        return False
+    peers = [h[epoch] for tid, h in history.items() if tid != trial_id and epoch in h]
+    if len(peers) < min_trials:
+        return False
+    return fitness < statistics.median(peers) * (1 - margin)
+
+
+def run_trial(
+    trial_id: str,
+    params: dict,
+    data_yaml: str,
+    batch: int,
+    threads: int,
+    history,
+    prune_after: int,
+    prune_min_trials: int,
+    prune_margin: float,
+    project: str
+) -> dict:
+    """
+    Train one trial (latency is measured later, after the pool finishes).
+
+    Args:
+        trial_id: Unique trial name (also the run directory name)
+        params: Training hyperparameters for this trial
+        data_yaml: Path to dataset YAML configuration
+        batch: Batch size
+        threads: Torch CPU threads for this trial
+        history: Shared {trial_id: {epoch: fitness}} used for pruning
+        prune_after: Epochs before a trial may be pruned
+        prune_min_trials: Peer results required before pruning
+        prune_margin: Relative fitness gap to the median that prunes a trial
+        project: Parent directory for trial runs
+
+    Returns:
+        Result row for the ranked table
+    """
+    import torch
+    from ultralytics import YOLO
+
+    history[trial_id] = {}
+    state = {'pruned_at': None}
+
+    def report_and_prune(trainer):
+        epoch = trainer.epoch + 1
+        fitness = float(trainer.fitness or 0.0)
+        # Manager dict proxies only see reassignment, not nested mutation
+        record = history[trial_id]
+        record[epoch] = fitness
+        history[trial_id] = record
+        if _should_prune(dict(history), trial_id, epoch, fitness,
+                         prune_after, prune_min_trials, prune_margin):
+            state['pruned_at'] = epoch
+            trainer.stop = True
+
+    def limit_threads(trainer):
+        # select_device() resets torch threads for CPU training; re-apply the
+        # per-trial limit so concurrent trials do not oversubscribe the CPU
+        torch.set_num_threads(threads)
+
+    model = YOLO('yolov8n.pt')
+    model.add_callback('on_fit_epoch_end', report_and_prune)
+    model.add_callback('on_pretrain_routine_start', limit_threads)
+    model.add_callback('on_train_start', limit_threads)
+    model.train(
+        data=data_yaml,
+        batch=batch,
+        device='cpu',
+        workers=0,  # the trainer forces 0 on CPU anyway
+        project=project,
+        name=trial_id,
+        exist_ok=True,
+        plots=False,
+        verbose=False,
+        **params
+    )
+
+    trainer = model.trainer
+    metrics = trainer.metrics or {}
+    row = {
+        'trial': trial_id,
+        **params,
+        'status': 'pruned' if state['pruned_at'] else 'complete',
+        'epochs_run': trainer.epoch + 1,
+        'fitness': float(trainer.best_fitness or 0.0),
+        'precision': metrics.get('metrics/precision(B)'),
+        'recall': metrics.get('metrics/recall(B)'),
+        'mAP50': metrics.get('metrics/mAP50(B)'),
+        'mAP50-95': metrics.get('metrics/mAP50-95(B)'),
+        'latency_ms': None,
+        'model': str(Path(trainer.save_dir) / 'weights' / 'best.pt'),
+    }
+    return row
+
+
+def build_grid(space: dict, max_trials: int = None, seed: int = 0) -> list:
+    """Cartesian product of the search space, optionally subsampled."""
+    keys = list(space)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+    if max_trials and len(grid) > max_trials:
+        grid = random.Random(seed).sample(grid, max_trials)
+    return grid
+
+
+def rank_trials(rows: list, target_map50: float = None) -> pd.DataFrame:
+    """
+    Rank trials: models meeting the accuracy target first, fastest first;
+    then the rest by accuracy.
+    """
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    # Failed trials have no metrics; if none finished, the columns are missing
+    for column in ('mAP50', 'latency_ms'):
+        if column not in df.columns:
+            df[column] = float('nan')
+    if target_map50 is not None:
+        df['meets_target'] = df['mAP50'].fillna(0) >= target_map50
+    else:
+        df['meets_target'] = True
+    df['_latency'] = df['latency_ms'].fillna(float('inf'))
+    df = df.sort_values(
+        ['meets_target', '_latency', 'mAP50'],
+        ascending=[False, True, False]
+    ).drop(columns='_latency').reset_index(drop=True)
+    df.index += 1
+    return df
+
+
+def run_sweep(
+    space: dict,
+    data_yaml: str = 'data_labeled/dataset.yaml',
+    batch: int = 8,
+    parallel: int = 2,
+    threads_per_trial: int = None,
+    max_trials: int = None,
+    prune_after: int = 3,
+    prune_min_trials: int = 2,
+    prune_margin: float = 0.2,
+    target_map50: float = None,
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION,
+    project: str = 'runs/sweep',
+    output_csv: str = 'runs/sweep/results.csv'
+) -> pd.DataFrame:
+    """
+    Run a hyperparameter sweep and return the ranked results table.
+
+    Args:
+        space: {param: [values]} for keys in SEARCH_KEYS
+        data_yaml: Path to dataset YAML configuration
+        batch: Batch size for every trial
+        parallel: Concurrent trials
+        threads_per_trial: Torch threads per trial (CPUs / parallel if None)
+        max_trials: Randomly subsample the grid to this many trials
+        prune_after: Epochs before a trial may be pruned
+        prune_min_trials: Peer results required before pruning
+        prune_margin: Prune when fitness is this far below the peer median
+        target_map50: Counting accuracy target (mAP@0.5) for ranking
+        holdout_fraction: Images held out (by file name hash) for validation
+        project: Parent directory for trial runs
+        output_csv: Path to save the ranked table
+    """
+    print("="*70)
+    print("AI TAKEOFF MVP - HYPERPARAMETER SWEEP")
+    print("="*70)
+
+    if not Path(data_yaml).exists():
+        raise FileNotFoundError(f"Dataset configuration not found: {data_yaml}")
+
+    split = build_holdout_dataset(str(data_yaml), output_dir=f'{project}/data',
+                                  holdout_fraction=holdout_fraction)
+    if not split['yaml']:
+        raise ValueError(
+            f"Held-out split ({holdout_fraction}) is empty; add labeled images or "
+            f"raise --holdout-fraction so trials are not ranked on training accuracy"
+        )
+
+    grid = build_grid(space, max_trials)
+    threads = threads_per_trial or max(1, (os.cpu_count() or 1) // parallel)
+
+    print(f"\n🔬 Trials: {len(grid)}")
+    print(f"   Images: {len(split['train'])} train, {len(split['holdout'])} held out")
+    print(f"   Parallel: {parallel} x {threads} thread(s)")
+    print(f"   Pruning: after epoch {prune_after}, "
+          f"{prune_margin:.0%} below peer median")
+
+    rows = []
+    ctx = mp.get_context('spawn')
+    with ctx.Manager() as manager:
+        history = manager.dict()
+        with ProcessPoolExecutor(
+            max_workers=parallel,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(threads,)
+        ) as pool:
+            futures = {}
+            for i, params in enumerate(grid, start=1):
+                trial_id = f"trial_{i:03d}"
+                futures[pool.submit(
+                    run_trial, trial_id, params, split['yaml'], batch, threads,
+                    history, prune_after, prune_min_trials, prune_margin, project
+                )] = (trial_id, params)
+
+            for future in as_completed(futures):
+                trial_id, params = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"   ❌ {trial_id} failed: {e}")
+                    rows.append({'trial': trial_id, **params, 'status': f'failed: {e}'})
+                    continue
+                rows.append(row)
+                print(f"   ✅ {trial_id} {row['status']} after {row['epochs_run']} epoch(s): "
+                      f"mAP50={row['mAP50'] or 0:.3f}")
+
+    # Benchmark one model at a time on an otherwise idle CPU
+    print(f"\n⏱️  Benchmarking completed trials ({threads} thread(s) each)...")
+    for row in rows:
+        if row.get('status') != 'complete' or not Path(row['model']).exists():
+            continue
+        stats = measure_latency(row['model'], imgsz=row['imgsz'], threads=threads)
+        row['latency_ms'] = round(stats['median_ms'], 2)
+        print(f"   • {row['trial']}: {row['latency_ms']:.1f} ms")
+
+    table = rank_trials(rows, target_map50)
+
+    print("\n" + "="*70)
+    print("📊 RANKED RESULTS")
+    print("="*70)
+    columns = [c for c in ('trial', *space, 'status', 'mAP50', 'mAP50-95',
+                           'latency_ms', 'meets_target') if c in table.columns]
+    print(table[columns].to_string())
+
+    if output_csv:
+        Path(output_csv).parent.mkdir(parents=True, exist_ok=True)
+        table.to_csv(output_csv, index_label='rank')
+        print(f"\n💾 Ranked table saved to: {output_csv}")
+
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Parallel hyperparameter sweep with early pruning'
+    )
+
+    parser.add_argument(
+        '--data',
+        type=str,
+        default='data_labeled/dataset.yaml',
+        help='Path to dataset YAML file'
+    )
+
+    parser.add_argument('--epochs', type=int, nargs='+', default=[20], help='Epoch values to try')
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[640], help='Image sizes to try')
+    parser.add_argument('--patience', type=int, nargs='+', default=[5], help='Patience values to try')
+    parser.add_argument('--mosaic', type=float, nargs='+', help='Mosaic probabilities to try')
+    parser.add_argument('--fliplr', type=float, nargs='+', help='Horizontal flip probabilities to try')
+    parser.add_argument('--degrees', type=float, nargs='+', help='Rotation degrees to try')
+    parser.add_argument('--scale', type=float, nargs='+', help='Scale gains to try')
+
+    parser.add_argument(
+        '--batch',
+        type=int,
+        default=8,
+        help='Batch size for every trial'
+    )
+
+    parser.add_argument(
+        '--parallel',
+        type=int,
+        default=2,
+        help='Number of concurrent trials'
+    )
+
+    parser.add_argument(
+        '--threads-per-trial',
+        type=int,
+        help='Torch threads per trial (default: CPUs / parallel)'
+    )
+
+    parser.add_argument(
+        '--max-trials',
+        type=int,
+        help='Randomly subsample the grid to this many trials'
+    )
+
+    parser.add_argument(
+        '--prune-after',
+        type=int,
+        default=3,
+        help='Epochs before a trial may be pruned'
+    )
+
+    parser.add_argument(
+        '--prune-margin',
+        type=float,
+        default=0.2,
+        help='Prune trials this far below the peer median fitness (0.2 = 20%%)'
+    )
+
+    parser.add_argument(
+        '--prune-min-trials',
+        type=int,
+        default=2,
+        help='Peer trials that must report an epoch before pruning on it'
+    )
+
+    parser.add_argument(
+        '--target-map50',
+        type=float,
+        help='Counting accuracy target (mAP@0.5); fastest model meeting it ranks first'
+    )
+
+    parser.add_argument(
+        '--holdout-fraction',
+        type=float,
+        default=DEFAULT_HOLDOUT_FRACTION,
+        help='Fraction of images held out (by file name hash) for validation'
+    )
+
+    parser.add_argument(
+        '--output-csv',
+        type=str,
+        default='runs/sweep/results.csv',
+        help='Path to save the ranked table'
+    )
+
+    args = parser.parse_args()
+
+    space = {key: getattr(args, key) for key in SEARCH_KEYS if getattr(args, key) is not None}
+
+    run_sweep(
+        space,
+        data_yaml=args.data,
+        batch=args.batch,
+        parallel=args.parallel,
+        threads_per_trial=args.threads_per_trial,
+        max_trials=args.max_trials,
+        prune_after=args.prune_after,
+        prune_min_trials=args.prune_min_trials,
+        prune_margin=args.prune_margin,
+        target_map50=args.target_map50,
+        holdout_fraction=args.holdout_fraction,
+        output_csv=args.output_csv
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -6,13 +6,24 @@ Use this for automated training pipelines or production environments.
 
 Usage:
     python scripts/train.py --epochs 20 --batch 8 --device cpu
+    python scripts/train.py --auto-tune --memory-budget-gb 12
+    python scripts/train.py --incremental --epochs 10
 """
 
 import argparse
+import json
+import shutil
 from pathlib import Path
 from ultralytics import YOLO
+import torch
 import yaml
 
+from autotune import autotune_training
+from dataset_index import index_dataset, print_index_report
+from incremental import (DEFAULT_HOLDOUT_FRACTION, build_holdout_dataset,
+                         build_incremental_dataset, load_manifest,
+                         manifest_matches_split, write_manifest)
+
 
 def train_model(
     data_yaml: str = 'data_labeled/dataset.yaml',
@@ -21,7 +32,17 @@ def train_model(
     imgsz: int = 640,
     device: str = 'cpu',
     name: str = 'takeoff_mvp',
-    patience: int = 5
+    patience: int = 5,
+    workers: int = 8,
+    cache=False,
+    threads: int = None,
+    auto_tune: bool = False,
+    memory_budget_gb: float = None,
+    incremental: bool = False,
+    base_model: str = 'models/best.pt',
+    replay_ratio: float = 2.0,
+    holdout_fraction: float = None,
+    validate: bool = True
 ):
     """
     Train YOLOv8 model for construction takeoff.
@@ -34,6 +55,22 @@ def train_model(
         device: Device to use ('cpu', 'cuda', or device number)
         name: Experiment name
         patience: Early stopping patience
+        workers: Dataloader worker processes
+        cache: Image caching ('ram', 'disk' or False)
+        threads: Torch intra-op threads (torch default if None)
+        auto_tune: Pick batch/workers/threads/cache with timed trials
+            (overrides the four arguments above)
+        memory_budget_gb: Memory budget for auto-tune (default: 75% of RAM)
+        incremental: Fine-tune base_model on new images plus a replay sample
+            of old ones, stopping once held-out validation matches it
+        base_model: Production model to fine-tune and guard against
+        replay_ratio: Old images replayed per new image (incremental)
+        holdout_fraction: Fraction of images held out (by file name hash)
+            for validation and never trained on. Full training uses every
+            image if None; incremental mode (and the full run it falls
+            back to) defaults to DEFAULT_HOLDOUT_FRACTION
+        validate: Index and validate images/labels before training and
+            stop on label errors
     """
     print("="*70)
     print("AI TAKEOFF MVP - TRAINING SCRIPT")
@@ -54,17 +91,157 @@ def train_model(
     
     # Check for training images
     images_dir = data_path.parent / config.get('train', 'images')
+    image_files = []
     if images_dir.exists():
         image_files = list(images_dir.glob('*.png')) + list(images_dir.glob('*.jpg'))
         print(f"   Training images: {len(image_files)}")
         
+        # Catch bad labels up front instead of minutes into training
+        if validate:
+            index = index_dataset(str(data_path))
+            print_index_report(index)
+            if index['errors']:
+                raise ValueError(
+                    f"{len(index['errors'])} label error(s) in dataset; fix them or "
+                    f"run with --no-validate"
+                )
+        
         if len(image_files) < 5:
             print("\n⚠️  WARNING: Less than 5 training images found.")
             print("   Consider adding more data for better results.")
     
+    # Incremental mode: new images + replay sample, validated on a held-out set
+    weights = 'yolov8n.pt'
+    train_data = data_path
+    train_kwargs = {}
+    manifest = None
+    incremental_data = None
+    baseline_fitness = None
+    trained_images = image_files
+    split_fraction = None
+    
+    if incremental:
+        # Incremental runs need a split the base model never trained on
+        if holdout_fraction is None:
+            holdout_fraction = DEFAULT_HOLDOUT_FRACTION
+        manifest = load_manifest(base_model)
+        if not Path(base_model).exists() or manifest is None:
+            print(f"\n⚠️  No training manifest for {base_model}; running full training.")
+            incremental = False
+        elif not manifest_matches_split(manifest, holdout_fraction):
+            print(f"\n⚠️  {base_model} was not trained with a {holdout_fraction} held-out "
+                  f"split; running full training.")
+            incremental = False
+        else:
+            incremental_data = build_incremental_dataset(
+                data_yaml=str(data_path),
+                manifest=manifest,
+                output_dir=f'runs/incremental/{name}',
+                replay_ratio=replay_ratio,
+                holdout_fraction=holdout_fraction
+            )
+            print(f"\n🔁 Incremental fine-tuning from: {base_model}")
+            print(f"   New images: {len(incremental_data['new'])}")
+            print(f"   Replayed images: {len(incremental_data['replay'])}")
+            print(f"   Held-out images: {len(incremental_data['holdout'])}")
+            
+            if not incremental_data['new']:
+                print("\n✅ No new labeled images since the last training run.")
+                return None
+            if not incremental_data['holdout']:
+                raise ValueError(
+                    "Held-out set is empty; increase --holdout-fraction or add more labeled images"
+                )
+            
+            weights = base_model
+            train_data = Path(incremental_data['yaml'])
+            # Fine-tune gently: explicit optimizer (optimizer='auto' ignores
+            # lr0), low LR, no warm-up from scratch
+            train_kwargs = {'optimizer': 'AdamW', 'lr0': 0.0005, 'warmup_epochs': 0}
+            split_fraction = holdout_fraction
+            
+            print(f"\n📏 Evaluating current model on held-out set...")
+            baseline = YOLO(base_model).val(
+                data=str(train_data),
+                imgsz=imgsz,
+                batch=batch,
+                device=device,
+                plots=False,
+                verbose=False
+            )
+            baseline_fitness = float(baseline.fitness)
+            print(f"   Baseline fitness: {baseline_fitness:.4f}")
+    
+    # Full mode with a split (requested, or falling back from --incremental):
+    # keep the held-out images out of training so later incremental runs
+    # compare against unseen images
+    if not incremental and holdout_fraction:
+        split = build_holdout_dataset(
+            str(data_path),
+            output_dir=f'runs/holdout/{name}',
+            holdout_fraction=holdout_fraction
+        )
+        if split['yaml']:
+            train_data = Path(split['yaml'])
+            trained_images = split['train']
+            split_fraction = holdout_fraction
+            print(f"\n📏 Held out {len(split['holdout'])} image(s) for validation "
+                  f"({holdout_fraction:.0%} by name hash; not trained on)")
+        else:
+            print(f"\n⚠️  Held-out split is empty; training and validating on all images.")
+            print(f"   Incremental mode will need a full retrain once more images exist.")
+    
+    # Auto-tune throughput settings
+    autotune_settings = None
+    if auto_tune:
+        autotune_settings = autotune_training(
+            data_yaml=str(data_path),
+            weights=weights,
+            imgsz=imgsz,
+            memory_budget_gb=memory_budget_gb,
+            device=device
+        )
+        batch = autotune_settings['batch']
+        workers = autotune_settings['workers']
+        threads = autotune_settings['threads']
+        cache = autotune_settings['cache']
+    
+    if threads:
+        torch.set_num_threads(threads)
+    
     # Load pre-trained model
-    print(f"\n🔄 Loading YOLOv8n model...")
-    model = YOLO('yolov8n.pt')
+    print(f"\n🔄 Loading model: {weights}")
+    model = YOLO(weights)
+    
+    if baseline_fitness is not None:
+        def stop_when_baseline_matched(trainer):
+            if trainer.fitness is not None and trainer.fitness >= baseline_fitness:
+                print(f"\n🏁 Held-out fitness {trainer.fitness:.4f} matches baseline "
+                      f"{baseline_fitness:.4f}; stopping early.")
+                trainer.stop = True
+        
+        model.add_callback('on_fit_epoch_end', stop_when_baseline_matched)
+    
+    if threads:
+        def apply_threads(trainer):
+            # select_device() resets torch threads for CPU training; re-apply
+            torch.set_num_threads(threads)
+        
+        model.add_callback('on_pretrain_routine_start', apply_threads)
+        model.add_callback('on_train_start', apply_threads)
+    
+    # Settings the trainer actually ran with (it may override workers on CPU)
+    effective_settings = {}
+    
+    def record_effective_settings(trainer):
+        effective_settings.update(
+            batch=trainer.args.batch,
+            workers=trainer.args.workers,
+            threads=torch.get_num_threads(),
+            cache=trainer.args.cache
+        )
+    
+    model.add_callback('on_train_epoch_start', record_effective_settings)
     
     # Training parameters
     print(f"\n⚙️  Training Parameters:")
@@ -73,12 +250,15 @@ def train_model(
     print(f"   Image size: {imgsz}")
     print(f"   Device: {device}")
     print(f"   Patience: {patience}")
+    print(f"   Workers: {workers}")
+    print(f"   Threads: {torch.get_num_threads()}")
+    print(f"   Cache: {cache}")
     
     # Start training
     print(f"\n🚀 Starting training...\n")
     
     results = model.train(
-        data=str(data_path),
+        data=str(train_data),
         epochs=epochs,
         imgsz=imgsz,
         batch=batch,
@@ -87,24 +267,66 @@ def train_model(
         save=True,
         plots=True,
         device=device,
-        verbose=True
+        workers=workers,
+        cache=cache,
+        verbose=True,
+        **train_kwargs
     )
     
     print("\n✅ Training completed!")
     
+    trainer = getattr(model, 'trainer', None)
+    results_dir = Path(trainer.save_dir) if trainer else Path(f'runs/detect/{name}')
+    
     # Save best model to models directory
-    source_model = Path(f'runs/detect/{name}/weights/best.pt')
-    target_model = Path('models/best.pt')
+    source_model = results_dir / 'weights' / 'best.pt'
+    target_model = Path(base_model) if incremental else Path('models/best.pt')
+    
+    promote = source_model.exists()
+    if promote and incremental:
+        new_fitness = float(trainer.best_fitness or 0.0)
+        print(f"\n📏 Held-out fitness: {new_fitness:.4f} (baseline {baseline_fitness:.4f})")
+        if new_fitness < baseline_fitness:
+            promote = False
+            print(f"⚠️  Fine-tuned model regressed; keeping {target_model}")
+            print(f"   Fine-tuned weights remain at: {source_model}")
     
-    if source_model.exists():
+    if promote:
         target_model.parent.mkdir(parents=True, exist_ok=True)
-        import shutil
+        if incremental and target_model.exists():
+            shutil.copy(target_model, target_model.with_name(f"{target_model.stem}_prev.pt"))
         shutil.copy(source_model, target_model)
         print(f"\n💾 Best model saved to: {target_model.absolute()}")
         print(f"   Model size: {target_model.stat().st_size / (1024*1024):.2f} MB")
+        
+        if incremental:
+            trained_images = set(manifest['images']) | {p.name for p in incremental_data['new']}
+            write_manifest(
+                target_model,
+                trained_images,
+                base_model=str(base_model),
+                holdout_fraction=split_fraction,
+                holdout_fitness=new_fitness,
+                baseline_fitness=baseline_fitness
+            )
+        else:
+            write_manifest(target_model, trained_images, base_model=weights,
+                           holdout_fraction=split_fraction)
+    
+    # Record the auto-tuned settings with the run, plus what really ran
+    if autotune_settings:
+        autotune_settings['effective'] = effective_settings
+        for key, value in effective_settings.items():
+            if key in autotune_settings and autotune_settings[key] != value:
+                print(f"\n⚠️  Trainer ran with {key}={value} (auto-tune chose "
+                      f"{autotune_settings[key]})")
+        autotune_file = results_dir / 'autotune.json'
+        autotune_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(autotune_file, 'w') as f:
+            json.dump(autotune_settings, f, indent=2)
+        print(f"\n🔧 Auto-tune settings saved to: {autotune_file}")
     
     # Display results location
-    results_dir = Path(f'runs/detect/{name}')
     print(f"\n📊 Training results saved to: {results_dir.absolute()}")
     print(f"   - results.png: Training metrics")
     print(f"   - confusion_matrix.png: Model performance")
@@ -171,6 +393,73 @@ def main():
         help='Early stopping patience'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Dataloader worker processes'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        type=str,
+        choices=['ram', 'disk'],
+        help='Cache images in RAM or on disk'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        type=int,
+        help='Torch CPU threads (default: torch default)'
+    )
+    
+    parser.add_argument(
+        '--auto-tune',
+        action='store_true',
+        help='Pick batch, workers, threads and cache with short timed trials'
+    )
+    
+    parser.add_argument(
+        '--memory-budget-gb',
+        type=float,
+        help='Memory budget for --auto-tune (default: 75%% of RAM)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Fine-tune the production model on new images plus a replay sample'
+    )
+    
+    parser.add_argument(
+        '--base-model',
+        type=str,
+        default='models/best.pt',
+        help='Production model for --incremental (default: models/best.pt)'
+    )
+    
+    parser.add_argument(
+        '--replay-ratio',
+        type=float,
+        default=2.0,
+        help='Old images replayed per new image in --incremental mode'
+    )
+    
+    parser.add_argument(
+        '--holdout-fraction',
+        type=float,
+        help='Fraction of images held out for validation and never trained on. '
+             'Full training uses all images unless set; --incremental defaults '
+             f'to {DEFAULT_HOLDOUT_FRACTION}, and the full run it falls back to holds '
+             'out the same split'
+    )
+    
+    parser.add_argument(
+        '--no-validate',
+        action='store_true',
+        help='Skip dataset indexing and label validation before training'
+    )
+    
     args = parser.parse_args()
     
     train_model(
@@ -180,7 +469,17 @@ def main():
         imgsz=args.imgsz,
         device=args.device,
         name=args.name,
-        patience=args.patience
+        patience=args.patience,
+        workers=args.workers,
+        cache=args.cache or False,
+        threads=args.threads,
+        auto_tune=args.auto_tune,
+        memory_budget_gb=args.memory_budget_gb,
+        incremental=args.incremental,
+        base_model=args.base_model,
+        replay_ratio=args.replay_ratio,
+        holdout_fraction=args.holdout_fraction,
+        validate=not args.no_validate
     )
 
 